@@ -0,0 +1,56 @@
+# Write throughput of fileutil.atomicWrite against the old rename-and-rewrite
+# used by saveConfFile, on large synthetic smb.conf and exports files.
+#
+#   python bench/bench_atomicwrite.py [directory]
+
+import os
+import sys
+import shutil
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from plugin.fileutil import atomicWrite
+
+def smbConf(shares):
+	lines = ["[global]", "   workgroup = WORKGROUP", "   server string = %h", ""]
+	for share in range(shares):
+		lines += ["[share%d]" % share, "   path = /media/hdd/share%d" % share, "   read only = no", "   guest ok = yes", "   create mask = 0644", ""]
+	return lines
+
+def exports(entries):
+	return ["/media/hdd/export%d 192.168.%d.0/24(rw,sync,no_subtree_check,no_root_squash)" % (entry, entry % 256) for entry in range(entries)]
+
+def oldSave(filename, linelist):
+	os.rename(filename, filename + ".org")
+	filedest = open(filename, "w")
+	filedest.writelines("%s\n" % item for item in linelist)
+	filedest.close()
+
+def newSave(filename, linelist):
+	atomicWrite(filename, ("%s\n" % item for item in linelist))
+
+def measure(save, filename, linelist, rounds=10):
+	with open(filename, "w") as f:
+		f.writelines("%s\n" % item for item in linelist)
+	start = time.time()
+	for i in range(rounds):
+		save(filename, linelist)
+	elapsed = (time.time() - start) / rounds
+	return (elapsed, os.path.getsize(filename) / elapsed / 1024 / 1024)
+
+def main():
+	directory = tempfile.mkdtemp(prefix="confwrite-", dir=len(sys.argv) > 1 and sys.argv[1] or None)
+	try:
+		for (name, linelist) in (("smb.conf", smbConf(5000)), ("exports", exports(50000))):
+			filename = os.path.join(directory, name)
+			size = sum(len(line) + 1 for line in linelist) / 1024.0
+			for (label, save) in (("rename+write", oldSave), ("atomic+fsync", newSave)):
+				(elapsed, throughput) = measure(save, filename, linelist)
+				print ("%-9s %7.0f KiB  %-13s %7.2f ms  %7.1f MiB/s" % (name, size, label, elapsed * 1000, throughput))
+	finally:
+		shutil.rmtree(directory)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,125 @@
+# What enigma2 pays to load the plugin at boot and on every plugin list
+# reload: the modules the descriptor module (plugin.py) imports eagerly,
+# directly and through the plugin's own modules, and the import time of
+# each plugin module in a fresh interpreter. "boot" is the real import of
+# plugin.py, "first use" the import of servicecenter.py on top of it, as
+# when the Service Center is opened for the first time.
+#
+#   python bench/bench_import.py [--plugin-dir DIR] [--repeat N]
+#
+# The package directory must be named "plugin", as in this repository.
+# enigma2 is replaced by the stubs in enigma2stubs.py, installed before the
+# clock starts, so the times are the plugin's own. The module graph comes
+# from the module-level import statements, so the same command run on an
+# older checkout gives the "before" numbers; a module that needs an enigma2
+# name the stubs lack gets "seconds": null. Results are one JSON document
+# on stdout.
+
+import os
+import sys
+import ast
+import json
+import argparse
+import subprocess
+
+ENIGMA2 = ("enigma", "Plugins", "Components", "Screens", "Tools")
+
+BENCH = os.path.dirname(os.path.abspath(__file__))
+
+TIMER = """
+import sys, time
+sys.path.insert(0, %r)
+sys.path.insert(0, %r)
+import enigma2stubs
+enigma2stubs.install()
+for module in %r:
+	__import__("plugin." + module)
+start = time.time()
+for module in %r:
+	__import__("plugin." + module)
+sys.stdout.write("\\n" + repr(time.time() - start))
+"""
+
+def eagerImports(filename):				# -> (sibling modules, other modules) imported at module level
+	with open(filename, "r") as f:
+		tree = ast.parse(f.read(), filename)
+	siblings = set()
+	others = set()
+	nodes = list(tree.body)
+	while nodes:
+		node = nodes.pop(0)
+		if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+			continue				# deferred until called or instantiated
+		if isinstance(node, ast.Import):
+			others.update(alias.name for alias in node.names)
+		elif isinstance(node, ast.ImportFrom):
+			if node.level:
+				if node.module:
+					siblings.add(node.module)
+				else:
+					siblings.update(alias.name for alias in node.names)
+			else:
+				others.add(node.module)
+		else:
+			for field in ("body", "orelse", "finalbody", "handlers"):
+				nodes += getattr(node, field, [])
+	return (siblings, others)
+
+def closure(plugindir, module):				# -> (plugin modules, external modules) loaded by importing module
+	seen = set()
+	external = set()
+	pending = [module]
+	while pending:
+		name = pending.pop()
+		filename = os.path.join(plugindir, name + ".py")
+		if name in seen or not os.path.exists(filename):
+			continue
+		seen.add(name)
+		(siblings, others) = eagerImports(filename)
+		pending += list(siblings)
+		external |= others
+	return (seen, external)
+
+def isEnigma2(module):
+	return module.split(".")[0] in ENIGMA2
+
+def importTime(plugindir, modules, repeat, preload=[]):	# median seconds to import modules together after preload, None if it fails
+	parent = os.path.dirname(os.path.abspath(plugindir))
+	times = []
+	for i in range(repeat):
+		try:
+			output = subprocess.check_output([sys.executable, "-c", TIMER % (BENCH, parent, preload, modules)], stderr=open(os.devnull, "w"))
+		except subprocess.CalledProcessError:
+			return None
+		times.append(float(output.decode("ascii").strip().splitlines()[-1]))
+	times.sort()
+	return times[len(times) // 2]
+
+def main():
+	default = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "plugin")
+	parser = argparse.ArgumentParser(description="plugin import cost")
+	parser.add_argument("--plugin-dir", default=default)
+	parser.add_argument("--repeat", type=int, default=5)
+	args = parser.parse_args()
+	plugindir = os.path.normpath(args.plugin_dir)
+	modules = sorted(name[:-3] for name in os.listdir(plugindir) if name.endswith(".py") and name != "__init__.py")
+	result = {"benchmark": "import", "python": sys.version.split()[0], "modules": {}}
+	for module in modules:
+		(own, external) = closure(plugindir, module)
+		enigma2 = sorted(name for name in external if isEnigma2(name))
+		entry = {"loads": sorted(own), "enigma2": enigma2, "stdlib": sorted(name for name in external if not isEnigma2(name))}
+		entry["seconds"] = importTime(plugindir, [module], args.repeat)
+		result["modules"][module] = entry
+	boot = result["modules"]["plugin"]
+	result["boot"] = {"plugin modules": len(boot["loads"]), "enigma2 modules": len(boot["enigma2"]), "seconds": boot["seconds"]}
+	if "servicecenter" in result["modules"]:
+		result["first use"] = {"seconds": importTime(plugindir, ["servicecenter"], args.repeat, ["plugin"])}
+	json.dump(result, sys.stdout, indent=1, sort_keys=True)
+	sys.stdout.write("\n")
+	milliseconds = lambda seconds: seconds is None and "failed" or "%.1fms" % (seconds * 1000)
+	sys.stderr.write("boot import: %d plugin modules, %d enigma2 modules, %s\n" % (result["boot"]["plugin modules"], result["boot"]["enigma2 modules"], milliseconds(result["boot"]["seconds"])))
+	if "first use" in result:
+		sys.stderr.write("first use: %s\n" % milliseconds(result["first use"]["seconds"]))
+
+if __name__ == "__main__":
+	main()
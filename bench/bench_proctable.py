@@ -0,0 +1,64 @@
+# Compare the old 'ps' output parsing in ServiceController.checkProcListFinished
+# with a ProcTable scan over a synthetic /proc tree.
+#
+#   python bench/bench_proctable.py [processes]
+
+import os
+import sys
+import shutil
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from plugin.proctable import ProcTable
+
+def makeProcRoot(root, processes):
+	lines = ["  PID USER       VSZ STAT COMMAND"]
+	for pid in range(1, processes + 1):
+		name = "daemon%d" % pid
+		path = os.path.join(root, str(pid))
+		os.mkdir(path)
+		with open(os.path.join(path, "comm"), "w") as f:
+			f.write(name[:15] + "\n")
+		with open(os.path.join(path, "cmdline"), "w") as f:
+			f.write("/usr/sbin/%s\0-f\0" % name)
+		lines.append("%5d root      1234 S    /usr/sbin/%s -f" % (pid, name))
+	return "\n".join(lines)
+
+def psParse(result, srvlist):
+	for srv in srvlist:
+		srv['state'] = False
+		for line in result.splitlines():
+			fields = line.split()
+			command = fields[4].strip()
+			if command.startswith("/"):
+				(path, command) = os.path.split(command)
+			if command.endswith(":"):
+				command = command.split(":")[0]
+			if command == srv['demon']:
+				srv['state'] = True
+				break
+
+def procScan(table, srvlist):
+	table.scan()
+	for srv in srvlist:
+		srv['state'] = table.running(srv['demon'])
+
+def main():
+	processes = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+	root = tempfile.mkdtemp(prefix="proc-")
+	try:
+		ps_output = makeProcRoot(root, processes)
+		table = ProcTable(root)
+		for count in (20, 500):
+			# every other service is not running, forcing a full walk in the ps path
+			srvlist = [{'name': "srv%d" % i, 'demon': "daemon%d" % (i * 2)} for i in range(count)]
+			ps = min(timeit.repeat(lambda: psParse(ps_output, srvlist), number=5, repeat=3)) / 5
+			proc = min(timeit.repeat(lambda: procScan(table, srvlist), number=5, repeat=3)) / 5
+			print ("services=%-4d processes=%-4d ps-parse=%.2fms proc-scan=%.2fms (ps fork not included)" % (count, processes, ps * 1000, proc * 1000))
+	finally:
+		shutil.rmtree(root)
+
+if __name__ == "__main__":
+	main()
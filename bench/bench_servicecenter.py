@@ -0,0 +1,137 @@
+# Time the ServiceCenter population path off the box: each stage on its own
+# and end to end, on a synthetic box image (see fixtures.py). The stages are
+# the screen's own methods, run on a real ServiceCenter built against the
+# enigma2 stubs (see enigma2stubs.py) with its controller pointed at the
+# fixture. Results are one JSON document on stdout; stage medians also go
+# to stderr for reading.
+#
+#   python bench/bench_servicecenter.py [--packages N] [--processes N] [--services N] [--repeat N]
+#
+# "cold" builds new indexes and catalog per run, as after a restart of
+# enigma2; "warm" reuses them, as when the screen is opened again. "open"
+# is the whole ServiceCenter constructor. enigma2 list rendering is not
+# included.
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import enigma2stubs
+enigma2stubs.install()
+
+from plugin.catalog import ServiceCatalog, PROBE_INETD
+from plugin.controller import ServiceControllerCore
+from plugin.executor import ThreadExecutor
+from plugin.probecache import probecache
+from plugin import proctable
+from plugin import servicecenter
+
+from fixtures import makeBox
+
+def ignore(data):
+	pass
+
+STAGES = [
+	("createServiceList", lambda screen: screen.createServiceList()),
+	("checkServiceListStatus", lambda screen: screen.checkServiceListStatus(screen.serviceList)),
+	("getPkgInfo", lambda screen: screen.getPkgInfo()),
+	("getBootInfo", lambda screen: screen.getBootInfo()),
+	("checkProcList", lambda screen: screen.sc.checkProcList([ignore, screen.serviceList])),
+	("checkSocketList", lambda screen: screen.sc.checkSocketList([ignore, [srv for srv in screen.serviceList if srv.probe == PROBE_INETD]])),
+	("updateEntryList", lambda screen: screen.updateEntryList()),
+]
+
+def fresh(paths, executor):				# new catalog and indexes, as after a restart
+	proctable.pins.clear()
+	servicecenter.servicecatalog = ServiceCatalog(paths["catalog"])
+	servicecenter.ServiceController = lambda: ServiceControllerCore(executor, paths["proc"], paths["opkg"], paths["etc"])
+
+def openScreen():					# -> (screen, seconds)
+	start = time.time()
+	screen = servicecenter.ServiceCenter(None)
+	elapsed = time.time() - start
+	screen.close()
+	return (screen, elapsed)
+
+def newState(paths, executor):				# a screen whose next run starts cold
+	fresh(paths, executor)
+	(screen, elapsed) = openScreen()
+	fresh(paths, executor)
+	screen.sc = servicecenter.ServiceController()
+	return screen
+
+def run(screen):					# -> {stage: seconds}, "total" included
+	timings = {}
+	start = time.time()
+	for (name, stage) in STAGES:
+		t = time.time()
+		stage(screen)
+		timings[name] = time.time() - t
+	timings["total"] = time.time() - start
+	return timings
+
+def summary(runs):
+	result = {}
+	for name in [stage[0] for stage in STAGES] + ["total", "open"]:
+		values = sorted(timings[name] for timings in runs if name in timings)
+		if not values:
+			continue
+		result[name] = {"min": values[0], "median": values[len(values) // 2], "max": values[-1]}
+	return result
+
+def main():
+	parser = argparse.ArgumentParser(description="ServiceCenter population benchmark")
+	parser.add_argument("--packages", type=int, default=800)
+	parser.add_argument("--processes", type=int, default=250)
+	parser.add_argument("--services", type=int, default=60)
+	parser.add_argument("--repeat", type=int, default=20)
+	args = parser.parse_args()
+	root = tempfile.mkdtemp(prefix="box-")
+	stdout = sys.stdout
+	try:
+		paths = makeBox(root, args.packages, args.processes, args.services)
+		executor = ThreadExecutor(1)
+		sys.stdout = open(os.devnull, "w")		# the plugin modules log every load
+		probecache.ttl = 0
+		cold = []
+		for i in range(args.repeat):
+			cold.append(run(newState(paths, executor)))
+			fresh(paths, executor)
+			cold[-1]["open"] = openScreen()[1]
+		screen = newState(paths, executor)
+		run(screen)
+		controller = screen.sc
+		servicecenter.ServiceController = lambda: controller	# on the box every controller shares the indexes
+		warm = []
+		for i in range(args.repeat):
+			warm.append(run(screen))
+			warm[-1]["open"] = openScreen()[1]
+		services = screen.serviceList
+	finally:
+		if sys.stdout is not stdout:
+			sys.stdout.close()
+			sys.stdout = stdout
+		shutil.rmtree(root)
+	result = {
+		"benchmark": "servicecenter",
+		"python": sys.version.split()[0],
+		"fixture": {"packages": args.packages, "processes": args.processes, "services": args.services},
+		"repeat": args.repeat,
+		"installed": len([srv for srv in services if srv.status]),
+		"running": len([srv for srv in services if srv.state]),
+		"cold": summary(cold),
+		"warm": summary(warm),
+	}
+	json.dump(result, sys.stdout, indent=1, sort_keys=True)
+	sys.stdout.write("\n")
+	for mode in ("cold", "warm"):
+		sys.stderr.write("%s: %s\n" % (mode, "  ".join("%s=%.2fms" % (name, result[mode][name]["median"] * 1000) for name in [stage[0] for stage in STAGES] + ["total", "open"])))
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,228 @@
+# Minimal stand-ins for the enigma2 modules the plugin imports, so the real
+# plugin.py and servicecenter.py can be imported and their screens driven
+# off the box. Nothing is drawn and no main loop runs: timers and socket
+# notifiers never fire, Console commands are not run. Call install() before
+# the first plugin import.
+
+import os
+import sys
+import types
+
+class eTimer():
+
+	def __init__(self):
+		self.callback = []
+
+	def start(self, ms, singleshot=False):
+		pass
+
+	def stop(self):
+		pass
+
+class eConsoleAppContainer():
+
+	def __init__(self):
+		self.dataAvail = []
+		self.appClosed = []
+
+	def execute(self, cmd):
+		return -1
+
+class eSocketNotifier():
+
+	def __init__(self, fd, events):
+		self.callback = []
+
+class Screen(dict):
+
+	def __init__(self, session):
+		dict.__init__(self)
+		self.session = session
+		self.onClose = []
+		self.onLayoutFinish = []
+
+	def setTitle(self, title):
+		pass
+
+	def close(self, *retval):
+		for callback in self.onClose:
+			callback()
+
+class MessageBox(Screen):
+
+	TYPE_YESNO = 0
+	TYPE_INFO = 1
+	TYPE_WARNING = 2
+	TYPE_ERROR = 3
+
+	def __init__(self, session, text, type=TYPE_YESNO, timeout=-1, **kwargs):
+		Screen.__init__(self, session)
+
+class StaticText():
+
+	def __init__(self, text=""):
+		self.text = text
+
+	def setText(self, text):
+		self.text = text
+
+	def getText(self):
+		return self.text
+
+class Label(StaticText):
+	pass
+
+class Pixmap():
+
+	def __init__(self):
+		self.visible = True
+		self.pixmap = 0
+
+	def show(self):
+		self.visible = True
+
+	def hide(self):
+		self.visible = False
+
+	def setPixmapNum(self, pixmap):
+		self.pixmap = pixmap
+
+class List():
+
+	def __init__(self, list=[]):
+		self.list = list
+		self.index = 0
+		self.onSelectionChanged = []
+
+	def setList(self, list):
+		self.list = list
+		self.index = min(self.index, max(0, len(list) - 1))
+
+	def modifyEntry(self, index, entry):
+		self.list[index] = entry
+
+	def getCurrent(self):
+		if self.index < len(self.list):
+			return self.list[self.index]
+		return None
+
+	def getIndex(self):
+		return self.index
+
+	def setIndex(self, index):
+		self.index = index
+
+	def count(self):
+		return len(self.list)
+
+class ListContent():					# the eListbox content behind .l
+
+	def __getattr__(self, name):
+		return nothing
+
+class ConfigList(List):
+
+	def __init__(self, list):
+		List.__init__(self, list)
+		self.l = ListContent()
+
+	def isChanged(self):
+		return [entry for entry in self.list if entry[1].isChanged()] != []
+
+class ConfigListScreen():
+
+	def __init__(self, list, session=None, on_change=None):
+		self["config"] = ConfigList(list)
+
+class ConfigElement():
+
+	def __init__(self, default=None, **kwargs):
+		self.default = default
+		self.value = default
+
+	def save(self):
+		pass
+
+	def isChanged(self):
+		return self.value != self.default
+
+class ConfigSubsection():
+	pass
+
+class Console():
+
+	def ePopen(self, cmd, callback=None, extra_args=None):
+		pass
+
+class PluginDescriptor():
+
+	WHERE_PLUGINMENU = 0
+	WHERE_EXTENSIONSMENU = 1
+	WHERE_MENU = 2
+	WHERE_SESSIONSTART = 3
+
+	def __init__(self, name="", description="", where=None, fnc=None, **kwargs):
+		self.name = name
+		self.where = where
+		self.fnc = fnc
+		self.path = None
+
+	def updateIcon(self, path):
+		pass
+
+class PluginComponent():
+
+	def __init__(self):
+		self.pluginList = []
+
+	def addPlugin(self, plugin):
+		self.pluginList.append(plugin)
+
+	def removePlugin(self, plugin):
+		self.pluginList.remove(plugin)
+
+def nothing(*args, **kwargs):
+	return None
+
+def module(name, **attributes):
+	parent = name.rpartition(".")[0]
+	if parent and parent not in sys.modules:
+		module(parent)
+	result = types.ModuleType(name)
+	result.__dict__.update(attributes)
+	sys.modules[name] = result
+	if parent:
+		setattr(sys.modules[parent], name.rpartition(".")[2], result)
+	return result
+
+def install():
+	if "enigma" in sys.modules:
+		return
+	config = ConfigSubsection()
+	config.plugins = ConfigSubsection()
+	module("enigma", eTimer=eTimer, eConsoleAppContainer=eConsoleAppContainer, eSocketNotifier=eSocketNotifier)
+	module("Plugins.Plugin", PluginDescriptor=PluginDescriptor)
+	module("Screens.Screen", Screen=Screen)
+	module("Screens.MessageBox", MessageBox=MessageBox)
+	module("Screens.VirtualKeyBoard", VirtualKeyBoard=Screen)
+	module("Screens.ChoiceBox", ChoiceBox=Screen)
+	module("Components.Label", Label=Label)
+	module("Components.ActionMap", ActionMap=nothing)
+	module("Components.Sources.StaticText", StaticText=StaticText)
+	module("Components.Sources.List", List=List)
+	module("Components.config", config=config, getConfigListEntry=lambda *args: args, NoSave=lambda element: element,
+		ConfigSubsection=ConfigSubsection, ConfigYesNo=ConfigElement, ConfigInteger=ConfigElement)
+	module("Components.ConfigList", ConfigListScreen=ConfigListScreen)
+	module("Components.Pixmap", Pixmap=Pixmap, MultiPixmap=Pixmap)
+	module("Components.Console", Console=Console)
+	module("Components.MultiContent", MultiContentEntryText=nothing, MultiContentEntryPixmapAlphaTest=nothing)
+	module("Components.MenuList", MenuList=ConfigList)
+	module("Components.PluginComponent", plugins=PluginComponent())
+	module("Tools.Directories", fileExists=os.path.exists, resolveFilename=lambda scope, path="": os.path.join("/usr/lib/enigma2/python", path),
+		SCOPE_PLUGINS=0, SCOPE_CURRENT_PLUGIN=1, SCOPE_CURRENT_SKIN=2)
+	module("Tools.LoadPixmap", LoadPixmap=lambda path=None, cached=False: path)
+	if sys.version_info[0] < 3:
+		import __builtin__ as builtins
+	else:
+		import builtins
+	builtins._ = lambda text: text
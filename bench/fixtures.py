@@ -0,0 +1,90 @@
+# Synthetic box images for the benchmarks: an opkg status database with
+# control files, a /proc tree with stat files and socket tables, /etc with
+# inetd.conf, services and rc links, and a services.xml catalog.
+#
+# Service i uses package "pkg<i>", init script "init<i>" and demon
+# "daemon<i>". Every third service is probed by pidfile and every tenth by
+# inetd. Packages beyond the catalog and processes beyond the demons are
+# filler.
+
+import os
+
+def write(path, text):
+	directory = os.path.dirname(path)
+	if not os.path.isdir(directory):
+		os.makedirs(directory)
+	with open(path, "w") as f:
+		f.write(text)
+
+def makeOpkg(root, packages):
+	entries = []
+	for package in range(packages):
+		name = "pkg%d" % package
+		control = "Package: %s\nVersion: 1.%d-r0\nDepends: libc6 (>= 2.31)\nStatus: install ok installed\nArchitecture: mips32el\nInstalled-Time: 1600000000\n" % (name, package)
+		entries.append(control)
+		write(os.path.join(root, "info", name + ".control"), control)
+	write(os.path.join(root, "status"), "\n".join(entries) + "\n")
+
+def makeProc(root, processes, demons):
+	for pid in range(1, processes + 1):
+		name = "daemon%d" % (pid - 1) if pid <= demons and pid % 4 else "worker%d" % pid	# every fourth demon is down
+		path = os.path.join(root, str(pid))
+		write(os.path.join(path, "comm"), name[:15] + "\n")
+		write(os.path.join(path, "cmdline"), "/usr/sbin/%s\0-f\0" % name)
+		write(os.path.join(path, "stat"), "%d (%s) S 1 %d %d 0 -1 4194560 100 0 0 0 %d %d 0 0 20 0 1 0 %d 4096000 300 4294967295 0 0 0 0 0 0 0 0 0 0 0 0 17 0 0 0 0 0 0\n" % (pid, name[:15], pid, pid, pid % 50, pid % 7, 1000 + pid))
+		write(os.path.join(path, "statm"), "1000 300 200 10 0 100 0\n")
+
+def makeSockets(root, ports):
+	header = "  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode\n"
+	lines = []
+	for (i, port) in enumerate(ports):
+		lines.append("%4d: 00000000:%04X 00000000:0000 0A 00000000:00000000 00:00000000 00000000     0        0 %d\n" % (i, port, 10000 + i))
+		lines.append("%4d: 0100007F:%04X 0100007F:C350 01 00000000:00000000 00:00000000 00000000     0        0 %d\n" % (i, port, 20000 + i))
+	write(os.path.join(root, "net", "tcp"), header + "".join(lines))
+	for table in ("tcp6", "udp", "udp6"):
+		write(os.path.join(root, "net", table), header)
+
+def makeEtc(root, services, inetd):
+	inetdconf = []
+	servicesfile = []
+	for i in inetd:
+		inetdconf.append("%sinetsrv%d\tstream\ttcp\tnowait\troot\t/usr/sbin/daemon%d\tdaemon%d\n" % ("" if i % 20 else "#", i, i, i))
+		servicesfile.append("inetsrv%d\t\t%d/tcp\n" % (i, 10000 + i))
+	write(os.path.join(root, "inetd.conf"), "# synthetic inetd.conf\n" + "".join(inetdconf))
+	write(os.path.join(root, "services"), "".join(servicesfile))
+	for runlevel in ("S", "0", "1", "2", "3", "4", "5", "6"):
+		directory = os.path.join(root, "rc%s.d" % runlevel)
+		os.makedirs(directory)
+		for i in range(0, services, 2):
+			kind = "S" if runlevel in ("2", "3", "4", "5") else "K"
+			os.symlink("../init.d/init%d" % i, os.path.join(directory, "%s%02dinit%d" % (kind, i % 100, i)))
+
+def makeCatalog(filename, services, root):
+	lines = ["<smconfig>"]
+	for i in range(services):
+		attrs = 'name="Service %d" package="pkg%d" initscript="init%d" demon="daemon%d" description="Synthetic service %d"' % (i, i, i, i, i)
+		if i % 10 == 0:
+			attrs += ' inetd="inetsrv%d"' % i
+		elif i % 3 == 0:
+			attrs += ' pidfile="%s/run/daemon%d.pid"' % (root, i)
+		lines.append("\t<service %s />" % attrs)
+	lines.append("</smconfig>")
+	write(filename, "\n".join(lines) + "\n")
+	for i in range(0, services, 6):
+		write(os.path.join(root, "run", "daemon%d.pid" % i), "%d\n" % (i + 1))
+
+# -> {"proc": ..., "opkg": ..., "etc": ..., "catalog": ...}
+def makeBox(root, packages=500, processes=200, services=50):
+	paths = {
+		"proc": os.path.join(root, "proc"),
+		"opkg": os.path.join(root, "var", "lib", "opkg"),
+		"etc": os.path.join(root, "etc"),
+		"catalog": os.path.join(root, "services.xml"),
+	}
+	inetd = [i for i in range(services) if i % 10 == 0]
+	makeOpkg(paths["opkg"], max(packages, services))
+	makeProc(paths["proc"], processes, services)
+	makeSockets(paths["proc"], [10000 + i for i in inetd])
+	makeEtc(paths["etc"], services, inetd)
+	makeCatalog(paths["catalog"], services, root)
+	return paths
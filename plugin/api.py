@@ -0,0 +1,187 @@
+import os
+import json
+import errno
+import socket
+from select import POLLIN, POLLOUT
+
+ACTIONS = ("start", "stop", "restart")
+
+# Requests are JSON objects, one per line: {"cmd": "list"}, {"cmd": "status",
+# "service": "Samba"}, {"cmd": "start"|"stop"|"restart", "service": ...},
+# {"cmd": "boot", "service": ..., "enable": true}. Every reply is one JSON
+# line with "ok" and either the result or "error".
+class ServiceAPI():
+
+	def __init__(self, controller, catalog, useraction=None):
+		self.sc = controller
+		self.catalog = catalog
+		self.useraction = useraction
+		self.queue = []				# (services, action, reply), one action at a time
+		self.running = False
+
+	def services(self):
+		services = self.catalog.load()
+		self.sc.packageInfo(services)
+		return services
+
+	def describe(self, srv):
+		return {"name": srv.name, "package": srv.package, "description": srv.description, "installed": srv.status,
+			"version": srv.status and srv.version or None, "state": srv.state, "boot": srv.boot,
+			"connections": srv.connections}
+
+	def snapshot(self, services):			# states from the shared probe snapshot
+		installed = [srv for srv in services if srv.status]
+		self.sc.probeStates(installed)
+		self.sc.bootInfo(installed)
+		return installed
+
+	def handle(self, request, reply):
+		try:
+			cmd = request.get("cmd")
+			services = self.services()
+			if cmd == "list":
+				self.snapshot(services)
+				return reply({"ok": True, "services": [self.describe(srv) for srv in services]})
+			matches = [srv for srv in services if srv.name == request.get("service")]
+			if not matches:
+				return reply({"ok": False, "error": "unknown service: %s" % request.get("service")})
+			srv = matches[0]
+			if not srv.status:
+				return reply({"ok": False, "error": "service not installed: %s" % srv.name})
+			if cmd == "status":
+				self.snapshot([srv])
+				return reply({"ok": True, "service": self.describe(srv)})
+			elif cmd in ACTIONS:
+				if self.useraction is not None:
+					self.useraction(srv.name, cmd)
+				self.queue.append(([srv], cmd, reply))
+				self.runNext()
+			elif cmd == "boot":
+				self.sc.setBoot(srv, bool(request.get("enable")), lambda result: reply({"ok": srv.boot == bool(request.get("enable")), "service": srv.name, "boot": srv.boot}))
+			else:
+				reply({"ok": False, "error": "unknown command: %s" % cmd})
+		except Exception as e:
+			print ("[ServiceAPI] request failed:", request, e)
+			reply({"ok": False, "error": str(e)})
+
+	def runNext(self):
+		if self.running or not self.queue:
+			return
+		self.running = True
+		(services, action, reply) = self.queue.pop(0)
+		def finished(ok, steps, elapsed):
+			self.running = False
+			if not steps:
+				reply({"ok": False, "service": services[0].name, "action": action, "error": "no %s command configured" % action})
+				return self.runNext()
+			reply({"ok": ok, "service": services[0].name, "action": action, "elapsed": round(elapsed, 3),
+				"steps": [{"step": label, "retval": retval, "command": round(command_time, 3), "ready": round(ready_time, 3) if ready_time is not None else None, "ok": step_ok}
+					for (label, retval, command_time, ready_time, step_ok) in steps]})
+			self.runNext()
+		self.sc.runAction(services[0], action, finished)
+
+# Unix socket transport. notifier(fd, callback, events) must call
+# callback(ready events) whenever fd is ready for events and return an object
+# that keeps the watch alive: an eSocketNotifier on the box, a select loop
+# elsewhere. Dropping the object ends the watch; there is one per fd, as the
+# enigma2 main loop allows no more. Replies are queued per client and written
+# as the socket accepts them, so a stalled client never blocks the main loop.
+class APIServer():
+
+	def __init__(self, api, path, notifier):
+		self.api = api
+		self.path = path
+		self.notifier = notifier
+		self.clients = {}			# fd -> [socket, input, notifier, output, watched events]
+		if os.path.exists(path):
+			os.remove(path)
+		self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		umask = os.umask(0o177)			# created 0600, never reachable by other users
+		try:
+			self.socket.bind(path)
+		finally:
+			os.umask(umask)
+		self.socket.listen(5)
+		self.socket.setblocking(False)
+		self.listener = notifier(self.socket.fileno(), self.accept, POLLIN)
+
+	def accept(self, what=None):
+		try:
+			(client, address) = self.socket.accept()
+		except socket.error:
+			return
+		client.setblocking(False)
+		fd = client.fileno()
+		self.clients[fd] = [client, b"", None, b"", 0]
+		self.watch(fd, POLLIN)
+
+	def watch(self, fd, events):
+		entry = self.clients[fd]
+		if entry[4] != events:
+			entry[2] = None				# release the old watch first
+			entry[2] = self.notifier(fd, lambda what, fd=fd: self.ready(fd, what), events)
+			entry[4] = events
+
+	def ready(self, fd, what):
+		if what & POLLOUT:
+			self.flush(fd)
+		if what & ~POLLOUT:			# data, hangup or error
+			self.receive(fd)
+
+	def receive(self, fd):
+		entry = self.clients.get(fd)
+		if entry is None:
+			return
+		try:
+			data = entry[0].recv(4096)
+		except socket.error:
+			return
+		if not data:
+			self.disconnect(fd)
+			return
+		entry[1] += data
+		while b"\n" in entry[1]:
+			(line, entry[1]) = entry[1].split(b"\n", 1)
+			if not line.strip():
+				continue
+			try:
+				request = json.loads(line.decode("utf-8"))
+			except ValueError:
+				self.send(fd, {"ok": False, "error": "invalid json"})
+				continue
+			self.api.handle(request, lambda response, fd=fd: self.send(fd, response))
+
+	def send(self, fd, response):
+		entry = self.clients.get(fd)
+		if entry is None:
+			return
+		entry[3] += (json.dumps(response) + "\n").encode("utf-8")
+		self.flush(fd)
+
+	def flush(self, fd):
+		entry = self.clients.get(fd)
+		if entry is None:
+			return
+		try:
+			sent = entry[0].send(entry[3])
+		except socket.error as e:
+			if e.errno not in (errno.EAGAIN, errno.EWOULDBLOCK):
+				self.disconnect(fd)
+				return
+			sent = 0
+		entry[3] = entry[3][sent:]
+		self.watch(fd, entry[3] and POLLIN | POLLOUT or POLLIN)	# POLLOUT only while output is queued
+
+	def disconnect(self, fd):
+		entry = self.clients.pop(fd, None)
+		if entry is not None:
+			entry[2] = None
+			entry[0].close()
+
+	def close(self):
+		for fd in list(self.clients):
+			self.disconnect(fd)
+		self.listener = None
+		self.socket.close()
+		if os.path.exists(self.path):
+			os.remove(self.path)
@@ -0,0 +1,57 @@
+import os
+
+RUNLEVELS = ("S", "0", "1", "2", "3", "4", "5", "6")
+
+# /etc/rc?.d symlinks: init script -> {runlevel: (S|K, priority)}, rescanned
+# only when one of the rc directories changes
+class BootLinkIndex():
+
+	def __init__(self, etc_root="/etc"):
+		self.etc_root = etc_root
+		self.key = None
+		self.scripts = {}
+
+	def rcDirs(self):
+		return [(runlevel, os.path.join(self.etc_root, "rc%s.d" % runlevel)) for runlevel in RUNLEVELS]
+
+	def dirKey(self):
+		key = []
+		for (runlevel, path) in self.rcDirs():
+			try:
+				key.append(os.stat(path).st_mtime)
+			except OSError:
+				key.append(None)
+		return tuple(key)
+
+	def refresh(self):
+		key = self.dirKey()
+		if key == self.key:
+			return False
+		scripts = {}
+		for (runlevel, path) in self.rcDirs():
+			try:
+				entries = os.listdir(path)
+			except OSError:
+				continue
+			for entry in entries:
+				if len(entry) < 4 or entry[0] not in "SK" or not entry[1:3].isdigit():
+					continue
+				try:
+					script = os.path.basename(os.readlink(os.path.join(path, entry)))
+				except OSError:
+					script = entry[3:]
+				scripts.setdefault(script, {})[runlevel] = (entry[0], int(entry[1:3]))
+		self.scripts = scripts
+		self.key = key
+		return True
+
+	def links(self, script):
+		return self.scripts.get(script, {})
+
+	def enabled(self, script):
+		for (kind, priority) in self.links(script).values():
+			if kind == "S":
+				return True
+		return False
+
+bootlinks = BootLinkIndex()
@@ -0,0 +1,163 @@
+import os
+import copy
+import json
+import stat
+
+from .depgraph import findCycles
+from .fileutil import atomicWrite
+
+try:
+	from xml.etree.cElementTree import parse as smparse
+except ImportError:
+	from xml.etree.ElementTree import parse as smparse
+
+PROBE_PROCESS = 0		# look for the demon in the process table
+PROBE_PIDFILE = 1		# pidfile exists while the demon runs
+PROBE_INETD = 2			# started on request by inetd
+
+class Service(object):
+
+	attributes = ("name", "package", "initscript", "demon", "description", "conffile", "pidfile", "inetd", "servicescripts", "customscript", "requires", "after", "watch")
+	persistent = attributes + ("probe",)		# what the catalog cache keeps, the rest is runtime state
+	__slots__ = persistent + ("status", "state", "version", "connections", "boot")
+
+	def __init__(self, attrib):
+		for key in self.attributes:
+			setattr(self, key, attrib.get(key))
+		if self.pidfile:
+			self.probe = PROBE_PIDFILE
+		elif self.inetd:
+			self.probe = PROBE_INETD
+		else:
+			self.probe = PROBE_PROCESS
+		self.reset()
+
+	def reset(self):
+		self.status = False
+		self.state = False
+		self.version = "N/A"
+		self.connections = 0
+		self.boot = False
+
+	def __getstate__(self):
+		return tuple(getattr(self, key) for key in self.__slots__)
+
+	def __setstate__(self, state):
+		for (key, value) in zip(self.__slots__, state):
+			setattr(self, key, value)
+
+	def __repr__(self):
+		return "<Service %s>" % self.name
+
+# services.xml plus the *.xml fragments of an optional drop-in directory,
+# merged by service name; every file is parsed once and reparsed only when
+# it changes, the optional sidecar keeps the parsed files across restarts
+# as JSON of the parsed attributes, never anything executable or runtime state
+class ServiceCatalog():
+
+	def __init__(self, filename, dropin=None, sidecar=None):
+		self.filename = filename
+		self.dropin = dropin
+		self.sidecar = sidecar
+		self.fragments = {}		# filename -> (key, services)
+		self.services = []
+
+	def fileKey(self, filename):
+		st = os.stat(filename)
+		return (st.st_mtime, st.st_size)
+
+	def catalogFiles(self):
+		files = [self.filename]
+		if self.dropin:
+			try:
+				files += [os.path.join(self.dropin, name) for name in sorted(os.listdir(self.dropin)) if name.endswith(".xml")]
+			except OSError:
+				pass
+		return files
+
+	def parse(self, filename):
+		tree = smparse(filename).getroot()
+		return [Service(service.attrib) for service in tree.findall("service")]
+
+	def loadSidecar(self):
+		if self.sidecar:
+			try:
+				st = os.stat(self.sidecar)
+				if st.st_uid != os.geteuid() or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+					print ("[ServiceCatalog] ignoring catalog cache not private to us:", self.sidecar)
+					return {}
+				with open(self.sidecar, "r") as f:
+					data = json.load(f)
+				if data["slots"] == list(Service.persistent):		# written by this plugin version
+					fragments = {}
+					for (filename, (key, records)) in data["fragments"].items():
+						services = []
+						for record in records:
+							service = Service.__new__(Service)
+							for (slot, value) in zip(Service.persistent, record):
+								setattr(service, slot, value)
+							service.reset()
+							services.append(service)
+						fragments[filename] = (tuple(key), services)
+					return fragments
+			except Exception:
+				pass
+		return {}
+
+	def saveSidecar(self):
+		if self.sidecar:
+			fragments = dict((filename, (key, [[getattr(service, slot) for slot in Service.persistent] for service in services])) for (filename, (key, services)) in self.fragments.items())
+			try:
+				atomicWrite(self.sidecar, [json.dumps({"slots": Service.persistent, "fragments": fragments})], backups=0)
+			except (IOError, OSError, TypeError, ValueError):
+				print ("[ServiceCatalog] could not write catalog cache:", self.sidecar)
+
+	def merge(self, files):
+		services = []
+		position = {}
+		for filename in files:
+			for service in self.fragments[filename][1]:
+				if service.name in position:
+					services[position[service.name]] = service
+				else:
+					position[service.name] = len(services)
+					services.append(service)
+		return services
+
+	def load(self):
+		if not self.fragments:
+			self.fragments = self.loadSidecar()
+		files = []
+		changed = parsed = False
+		for filename in self.catalogFiles():
+			try:
+				key = self.fileKey(filename)
+			except OSError:
+				print ("[ServiceCatalog] could not read catalog file:", filename)
+				continue
+			files.append(filename)
+			if filename not in self.fragments or self.fragments[filename][0] != key:
+				try:
+					self.fragments[filename] = (key, self.parse(filename))
+				except Exception:
+					print ("[ServiceCatalog] could not parse catalog file:", filename)
+					self.fragments.pop(filename, None)
+					files.pop()
+					continue
+				changed = parsed = True
+		for filename in list(self.fragments):
+			if filename not in files:
+				del self.fragments[filename]
+				changed = True
+		if changed or not self.services:
+			self.services = self.merge(files)
+			for cycle in findCycles(self.services):
+				print ("[ServiceCatalog] dependency cycle, ignoring dependencies of:", " -> ".join(cycle))
+				for (index, service) in enumerate(self.services):
+					if service.name in cycle:		# on a copy, the parsed fragment stays as written
+						service = self.services[index] = copy.copy(service)
+						service.requires = service.after = None
+			print ("[ServiceCatalog] services:", len(self.services))
+		if parsed:
+			self.saveSidecar()
+		return self.services
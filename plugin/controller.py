@@ -0,0 +1,450 @@
+import os
+import time
+
+from .proctable import ProcTable
+from .pkgindex import PackageIndex, packageindex
+from .netstate import SocketTable
+from .bootlinks import BootLinkIndex, bootlinks
+from .inetdconf import InetdConfig, inetdconf
+from .sampler import ResourceSampler, resourcesampler
+from .catalog import PROBE_PROCESS, PROBE_PIDFILE, PROBE_INETD
+from .probecache import probecache
+from .depgraph import DependencyScheduler
+
+BATCH_SKIPPED = "skipped"		# batch result of a service whose required service failed
+BATCH_READY_TIMEOUT = 15		# seconds a started service may take to come up before its dependents are skipped
+BATCH_READY_POLL = 250			# ms
+
+SAMPLE_RESCAN = 30			# seconds, how long resource sampling trusts a service's pid set while its pin holds
+
+ACTION_READY_TIMEOUT = 30		# seconds a step's service may take to reach its state after the command returned
+ACTION_POLL_START = 100			# ms, readiness poll, doubled up to ACTION_POLL_MAX
+ACTION_POLL_MAX = 1000
+
+# One service action as a strict sequence of steps. A step runs its command
+# (or an in-process change), waits for the exit code, then probes until the
+# service reached the step's state or the deadline passed; the next step
+# starts only after that. callback(ok, steps, elapsed) once the last step
+# finished or one failed, steps: [(label, retval, command seconds, ready
+# seconds or None if not probed, ok)]; stepcallback(step) after each step.
+# A service without any command for the action fails with no steps. The
+# controller holds the pipeline until it finished.
+class ActionPipeline():
+
+	def __init__(self, controller, srv, action, callback, stepcallback=None, timeout=ACTION_READY_TIMEOUT):
+		self.sc = controller
+		self.srv = srv
+		self.action = action
+		self.callback = callback
+		self.stepcallback = stepcallback
+		self.timeout = timeout
+		self.pending = controller.actionSteps(srv, action)
+		self.steps = []
+		self.timer = controller.executor.timer(self.checkReady)
+
+	def start(self):
+		self.start_time = time.time()
+		if not self.pending:
+			print ("[ServiceController] action %s %s: no action configured" % (self.action, self.srv.name))
+			self.finish(False)
+			return
+		self.nextStep()
+
+	def nextStep(self):
+		if not self.pending:
+			self.finish(True)
+			return
+		(self.label, command, self.target) = self.pending.pop(0)
+		self.step_start = time.time()
+		if callable(command):						# returns False on failure
+			try:
+				retval = command() is False and 1 or 0
+			except (IOError, OSError) as e:
+				print ("[ServiceController] action %s %s: %s failed: %s" % (self.action, self.srv.name, self.label, e))
+				retval = -1
+			self.commandFinished("", retval)
+		else:
+			self.sc.executor.run(command, self.commandFinished)
+
+	def commandFinished(self, result, retval, extra_args=None):
+		probecache.invalidate()						# the command changed the service state
+		self.command_time = time.time() - self.step_start
+		if retval != 0:
+			self.stepDone(retval, None, False)
+		elif self.target is None:
+			self.stepDone(retval, None, True)
+		else:
+			self.ready_start = time.time()
+			self.deadline = self.ready_start + self.timeout
+			self.delay = ACTION_POLL_START
+			self.checkReady()
+
+	def checkReady(self):
+		self.timer.stop()
+		reached = self.sc.reachedState(self.srv, self.target)
+		if reached or time.time() > self.deadline:
+			self.stepDone(0, time.time() - self.ready_start, reached)
+			return
+		self.timer.start(self.delay, True)
+		self.delay = min(self.delay * 2, ACTION_POLL_MAX)
+
+	def stepDone(self, retval, ready_time, ok):
+		step = (self.label, retval, self.command_time, ready_time, ok)
+		self.steps.append(step)
+		if ready_time is None:
+			print ("[ServiceController] action %s %s: %s  retval: %s  %.2fs" % (self.action, self.srv.name, self.label, retval, self.command_time))
+		else:
+			print ("[ServiceController] action %s %s: %s  retval: %s  %.2fs, %s after %.2fs" % (self.action, self.srv.name, self.label, retval, self.command_time,
+				ok and (self.target and "running" or "stopped") or "state not reached", ready_time))
+		if self.stepcallback is not None:
+			self.stepcallback(step)
+		if ok:
+			self.nextStep()
+		else:
+			self.finish(False)
+
+	def finish(self, ok):
+		if self in self.sc.pipelines:
+			self.sc.pipelines.remove(self)
+		elapsed = time.time() - self.start_time
+		print ("[ServiceController] action %s %s: %s in %.2fs" % (self.action, self.srv.name, ok and "done" or "failed", elapsed))
+		self.callback(ok, self.steps, elapsed)
+
+# probes, package/boot info and service actions without any enigma2 import;
+# commands and timers go through the executor (see executor.py)
+class ServiceControllerCore():
+
+	def __init__(self, executor, proc_root="/proc", opkg_root=None, etc_root=None):	# roots other than the defaults get their own indexes
+		self.executor = executor
+		self.proctable = ProcTable(proc_root)
+		self.resourcesampler = resourcesampler
+		if proc_root != "/proc":
+			self.resourcesampler = ResourceSampler(proc_root)
+		self.initd = os.path.join(etc_root or "/etc", "init.d")
+		if etc_root is None:
+			self.sockettable = SocketTable(proc_root)
+			self.bootlinks = bootlinks
+			self.inetdconf = inetdconf
+		else:
+			self.sockettable = SocketTable(proc_root, os.path.join(etc_root, "services"))
+			self.bootlinks = BootLinkIndex(etc_root)
+			self.inetdconf = InetdConfig(os.path.join(etc_root, "inetd.conf"))
+		if opkg_root is None:
+			self.packageindex = packageindex
+		else:
+			self.packageindex = PackageIndex(os.path.join(opkg_root, "status"), os.path.join(opkg_root, "info"))
+		self.batch_timer = executor.timer(self.batchCheckReady)
+		self.pipelines = []						# running actions, see ActionPipeline
+		self.sample_pids = {}						# name -> (time, pids) of the last scan for resource sampling
+
+	def checkProcList(self, args):								# args: list of arguments
+		(callback) = args[0]
+		srvlist = args[1]
+		self.scanned = False
+		for srv in srvlist:
+			if srv.probe != PROBE_INETD:				# set by checkSocketList
+				srv.state = self.processState(srv)
+				print ("[ServiceController] service: %s  state: %s" % (srv.name, srv.state))
+		callback(srvlist)
+
+	def checkSocketList(self, args):							# args: list of arguments, inetd services only
+		(callback) = args[0]
+		srvlist = args[1]
+		self.scanSocketList()
+		for srv in srvlist:
+			self.inetdState(srv)
+			print ("[ServiceController] service: %s  state: %s  connections: %d" % (srv.name, srv.state, srv.connections))
+		callback(srvlist)
+
+	def inetdState(self, srv):
+		(listening, srv.connections) = self.sockettable.connections(srv.inetd)
+		if srv.connections:
+			srv.state = True
+		elif listening:
+			srv.state = None
+		else:
+			srv.state = False
+
+	def sampleResources(self, srv):							# only process based services of known demon name
+		if not srv.state or srv.probe == PROBE_INETD:
+			return None
+		now = time.time()
+		pid = self.proctable.pinned(srv.name)				# one stat read while the main process lives
+		last = self.sample_pids.get(srv.name)
+		if pid is None or last is None or pid not in last[1] or now - last[0] > SAMPLE_RESCAN:
+			self.scanProcList(pid is not None and SAMPLE_RESCAN or None)	# full scan only on a new or lost pin, and for new children
+			pids = self.proctable.pids(srv.demon)
+			if pid is None and pids:
+				self.proctable.pin(srv.name, pids[0])
+			last = self.sample_pids[srv.name] = (now, pids)
+		return self.resourcesampler.sample(srv.name, last[1])
+
+	def scanProcList(self, ttl=None):						# ttl: maximum age of a shared snapshot in seconds
+		self.proctable.index = probecache.get(("proc", self.proctable.root), self.proctable.scan, ttl)
+
+	def scanSocketList(self, ttl=None):
+		(self.sockettable.listening, self.sockettable.established) = probecache.get(("net", self.sockettable.proc_root), self.sockettable.scan, ttl)
+
+	def probeStates(self, srvlist, ttl=None):					# each service by its own probe, synchronous
+		self.scanned = False
+		if PROBE_INETD in set(srv.probe for srv in srvlist):
+			self.scanSocketList(ttl)
+		for srv in srvlist:
+			if srv.probe == PROBE_INETD:
+				self.inetdState(srv)
+			else:
+				srv.state = self.processState(srv, ttl)
+		return srvlist
+
+	def readPidfile(self, pidfile):						# -> pid, 0 if unreadable, None if there is no pidfile
+		try:
+			with open(pidfile, "r") as f:
+				return int(f.read().split()[0])
+		except (IOError, OSError):
+			return None
+		except (ValueError, IndexError):
+			return 0
+
+	def processState(self, srv, ttl=None):					# pinned pid first, one full scan per probe round on a mismatch
+		if srv.probe == PROBE_PIDFILE:
+			pid = self.readPidfile(srv.pidfile)
+			if pid is None:
+				self.proctable.unpin(srv.name)
+				return False
+			if pid and self.proctable.pinned(srv.name, pid) is not None:
+				return True
+			if pid and (not srv.demon or srv.demon in self.proctable.names(str(pid))) and self.proctable.pin(srv.name, pid):
+				return True
+			if not srv.demon:					# stale pidfile, nothing else to look for
+				return False
+		elif self.proctable.pinned(srv.name) is not None:
+			return True
+		if not self.scanned:
+			self.scanProcList(ttl)
+			self.scanned = True
+		for pid in self.proctable.pids(srv.demon):
+			if self.proctable.pin(srv.name, pid):
+				return True
+		self.proctable.unpin(srv.name)
+		return False
+
+	def packageInfo(self, srvlist):
+		self.packageindex.refresh()
+		busybox = self.packageindex.version("busybox")
+		for srv in srvlist:
+			srv.status = self.packageindex.installed(srv.package)
+			if srv.status:
+				version = self.packageindex.version(srv.package)
+				if version == busybox:
+					version += "  [Busybox]"
+				srv.version = version
+#				print ("[ServiceManager] service %s  version %s" % (srv.name , srv.version))
+
+	def bootInfo(self, srvlist):
+		self.bootlinks.refresh()
+		for srv in srvlist:
+			if srv.inetd:
+				srv.boot = self.inetdconf.enabled(srv.inetd)
+			elif srv.initscript:
+				srv.boot = self.bootlinks.enabled(srv.initscript)
+			else:
+				srv.boot = False
+
+	def setBoot(self, srv, enable, callback=None):
+		srv.boot = enable
+		if srv.inetd:
+			retval = "0"
+			if self.inetdconf.enabled(srv.inetd) != enable and not self.inetdconf.toggle(srv.inetd):
+				print ("[ServiceController] no inetd.conf entry for %s" % srv.inetd)
+				srv.boot = self.inetdconf.enabled(srv.inetd)
+				retval = "1"
+			if callback is not None:
+				callback(retval)
+		elif srv.initscript:
+			if enable:
+				init_cmd = "update-rc.d %s defaults"
+			else:
+				init_cmd = "update-rc.d -f %s remove"
+			self.runCmd(init_cmd % srv.initscript, callback)
+		elif callback is not None:
+			callback("0")
+
+	def actionCommands(self, srv, action):
+		if srv.servicescripts:
+			servicescripts = srv.servicescripts.split(',')
+			commands = []
+			if action != "start":
+				commands.append(servicescripts[0])
+			if action != "stop":
+				commands.append(servicescripts[1])
+			return commands
+		elif srv.customscript:
+			return ["%s %s" % (srv.customscript, action)]
+		elif srv.initscript:
+			return ["%s %s" % (os.path.join(self.initd, srv.initscript), action)]
+		return []
+
+	def actionSteps(self, srv, action):					# -> [(label, command or callable, target state or None)]
+		if srv.inetd:
+			steps = []
+			if action != "restart" and self.inetdconf.enabled(srv.inetd) == (action == "stop"):
+				steps.append(("inetd.conf", lambda: self.inetdconf.toggle(srv.inetd), None))
+			target = action != "stop"
+			if not self.sockettable.ports(srv.inetd):		# no port known, nothing to probe
+				target = None
+			steps.append(("killall -HUP inetd", "killall -HUP inetd", target))
+			return steps
+		commands = self.actionCommands(srv, action)
+		targets = [action != "stop"]
+		if len(commands) > 1:						# separate stop and start scripts
+			targets = [False, True]
+		if srv.probe == PROBE_PROCESS and not srv.demon:
+			targets = [None, None]
+		return [(command, command, target) for (command, target) in zip(commands, targets)]
+
+	def reachedState(self, srv, target):					# target True: running, False: stopped
+		if srv.probe == PROBE_INETD:					# listening is enough, open connections outlive a stop
+			self.scanSocketList(0)
+			self.inetdState(srv)
+			(listening, established) = self.sockettable.connections(srv.inetd)
+			return bool(listening) == target
+		self.probeStates([srv], 0)
+		return bool(srv.state) == target
+
+	def runAction(self, srv, action, callback, stepcallback=None):		# see ActionPipeline
+		pipeline = ActionPipeline(self, srv, action, callback, stepcallback)
+		self.pipelines.append(pipeline)
+		pipeline.start()
+		return pipeline
+
+	def runBatch(self, srvlist, action, callback, concurrency=1):	# callback(results, elapsed), results: [(service, retval)]
+		self.batch_order = list(srvlist)
+		self.batch_scheduler = DependencyScheduler(srvlist, reverse=action == "stop")
+		self.batch_ready = []
+		self.batch_waiting = {}						# name -> (service, retval, deadline), started but not yet running
+		self.batch_action = action
+		self.batch_callback = callback
+		self.batch_concurrency = max(1, concurrency)
+		self.batch_running = 0
+		self.batch_results = {}
+		self.batch_inetd = []
+		self.batch_start = time.time()
+		self.batchNext()
+
+	def batchNext(self):
+		progress = True
+		while progress:
+			progress = False
+			(ready, skipped) = self.batch_scheduler.next()
+			for srv in skipped:
+				print ("[ServiceController] batch service: %s  skipped, required service failed" % srv.name)
+				self.batch_results[srv.name] = BATCH_SKIPPED
+			self.batch_ready += ready
+			while self.batch_ready and self.batch_running < self.batch_concurrency:
+				srv = self.batch_ready.pop(0)
+				if srv.inetd:						# all inetd changes share one HUP
+					if self.batch_action != "restart" and self.inetdconf.enabled(srv.inetd) == (self.batch_action == "stop"):
+						if not self.inetdconf.toggle(srv.inetd):
+							print ("[ServiceController] batch service: %s  no inetd.conf entry" % srv.name)
+							self.batch_results[srv.name] = 1
+							self.batch_scheduler.finish(srv.name, False)
+							progress = True
+							continue
+					self.batch_inetd.append(srv)
+					self.batch_scheduler.finish(srv.name, True)
+					progress = True
+					continue
+				commands = self.actionCommands(srv, self.batch_action)
+				if not commands:
+					self.batch_results[srv.name] = None
+					self.batch_scheduler.finish(srv.name, True)
+					progress = True
+					continue
+				self.batch_running += 1
+				self.executor.run(commands[0], self.batchCmdFinished, (srv, commands[1:]))
+		if self.batch_ready or self.batch_running:
+			return
+		for srv in self.batch_scheduler.remaining():		# unreachable, only with a dependency cycle
+			self.batch_results[srv.name] = BATCH_SKIPPED
+		if self.batch_inetd:
+			self.batch_running += 1
+			self.executor.run("killall -HUP inetd", self.batchHupFinished)
+			return
+		results = [(srv, self.batch_results.get(srv.name)) for srv in self.batch_order]
+		elapsed = time.time() - self.batch_start
+		print ("[ServiceController] batch %s: %d services in %.2fs" % (self.batch_action, len(results), elapsed))
+		self.batch_callback(results, elapsed)
+
+	def batchCmdFinished(self, result, retval, args):
+		(srv, commands) = args
+		probecache.invalidate()
+		if retval == 0 and commands:
+			self.executor.run(commands[0], self.batchCmdFinished, (srv, commands[1:]))
+			return
+		print ("[ServiceController] batch service: %s  retval: %s" % (srv.name, retval))
+		if retval == 0 and self.batch_action != "stop" and self.batch_scheduler.hasDependents(srv.name):
+			self.batch_waiting[srv.name] = (srv, retval, time.time() + BATCH_READY_TIMEOUT)
+			self.batchCheckReady()
+			return
+		self.batchServiceDone(srv, retval, retval == 0)
+
+	def batchCheckReady(self):							# dependents start only once the service really runs
+		self.batch_timer.stop()
+		self.probeStates([waiting[0] for waiting in self.batch_waiting.values()], 0)
+		now = time.time()
+		for (srv, retval, deadline) in list(self.batch_waiting.values()):
+			running = bool(srv.state)
+			if running or now > deadline:
+				if not running:
+					print ("[ServiceController] batch service: %s  not running after %ds" % (srv.name, BATCH_READY_TIMEOUT))
+				del self.batch_waiting[srv.name]
+				self.batchServiceDone(srv, retval, running)
+		if self.batch_waiting:
+			self.batch_timer.start(BATCH_READY_POLL, True)
+
+	def batchServiceDone(self, srv, retval, ok):
+		self.batch_results[srv.name] = retval
+		self.batch_scheduler.finish(srv.name, ok)
+		self.batch_running -= 1
+		self.batchNext()
+
+	def batchHupFinished(self, result, retval, args=None):
+		probecache.invalidate()
+		for srv in self.batch_inetd:
+			self.batch_results[srv.name] = retval
+		self.batch_inetd = []
+		self.batch_running -= 1
+		self.batchNext()
+
+	def runStreaming(self, cmd, linecallback, callback):				# linecallback(line) per output line, callback(retval)
+		self.stream_buffer = ""
+		self.stream_linecallback = linecallback
+		self.stream_callback = callback
+		self.executor.stream(cmd, self.streamData, self.streamClosed)
+
+	def streamData(self, data):
+		if not isinstance(data, str):
+			data = data.decode("utf-8", "replace")
+		lines = (self.stream_buffer + data).split("\n")
+		self.stream_buffer = lines.pop()
+		lines = [line.strip() for line in lines if line.strip()]
+		if lines:
+			self.stream_linecallback(lines[-1])
+
+	def streamClosed(self, retval):
+		probecache.invalidate()
+		self.stream_callback(retval)
+
+	def runCmd(self, cmd, callback=None):
+		self.executor.run(cmd, self.runCmdFinished, callback)
+
+	def runCmdFinished(self, result, retval, callback):
+		probecache.invalidate()						# commands change service states
+		if callback is not None:
+			(callback) = callback
+			if result:
+				callback(result.strip())
+				print ("[ServiceController] result:", result.strip())
+			else:
+				callback(str(retval))
+				print ("[ServiceController] retval:", retval)
@@ -0,0 +1,108 @@
+# requires="A,B": start only after A and B are running, skip if one of them fails
+# after="A,B": start after A and B if they are part of the same batch
+
+def parseNames(value):
+	if not value:
+		return []
+	return [name.strip() for name in value.split(",") if name.strip()]
+
+def dependencies(service):
+	return parseNames(service.requires) + parseNames(service.after)
+
+def findCycles(services):
+	byname = dict((service.name, service) for service in services)
+	state = {}					# name -> 1 visiting, 2 done
+	cycles = []
+	for root in services:
+		if root.name in state:
+			continue
+		stack = [(root.name, iter(dependencies(root)))]
+		path = [root.name]
+		state[root.name] = 1
+		while stack:
+			(name, deps) = stack[-1]
+			for dep in deps:
+				if dep not in byname:
+					continue
+				if state.get(dep) == 1:
+					cycles.append(path[path.index(dep):])
+				elif dep not in state:
+					state[dep] = 1
+					path.append(dep)
+					stack.append((dep, iter(dependencies(byname[dep]))))
+					break
+			else:
+				state[name] = 2
+				path.pop()
+				stack.pop()
+	return cycles
+
+def requiredClosure(services, catalog):
+	byname = dict((service.name, service) for service in catalog)
+	result = list(services)
+	names = set(service.name for service in services)
+	queue = list(services)
+	while queue:
+		for name in parseNames(queue.pop(0).requires):
+			service = byname.get(name)
+			if service is not None and name not in names and service.status and not service.state:
+				names.add(name)
+				result.append(service)
+				queue.append(service)
+	return result
+
+# hands out the services of one batch as soon as the services they wait for
+# are finished; stopping runs the graph in reverse and never skips
+class DependencyScheduler():
+
+	def __init__(self, services, reverse=False):
+		self.services = list(services)
+		names = set(service.name for service in self.services)
+		self.waiting = dict((service.name, set()) for service in self.services)
+		self.required = dict((service.name, set()) for service in self.services)
+		for service in self.services:
+			for dep in dependencies(service):
+				if dep in names and dep != service.name:
+					if reverse:
+						self.waiting[dep].add(service.name)
+					else:
+						self.waiting[service.name].add(dep)
+			if not reverse:
+				self.required[service.name] = set(dep for dep in parseNames(service.requires) if dep in names)
+		self.started = set()
+		self.failed = set()
+
+	def next(self):							# -> (services to start now, services skipped)
+		ready = []
+		skipped = []
+		changed = True
+		while changed:						# a skip may skip the services requiring it
+			changed = False
+			for service in self.services:
+				name = service.name
+				if name in self.started:
+					continue
+				if self.required[name] & self.failed:
+					self.started.add(name)
+					skipped.append(service)
+					self.finish(name, False)
+					changed = True
+				elif not self.waiting[name]:
+					self.started.add(name)
+					ready.append(service)
+		return (ready, skipped)
+
+	def finish(self, name, ok):
+		if not ok:
+			self.failed.add(name)
+		for waiting in self.waiting.values():
+			waiting.discard(name)
+
+	def hasDependents(self, name):
+		for (other, waiting) in self.waiting.items():
+			if name in waiting and other not in self.started:
+				return True
+		return False
+
+	def remaining(self):
+		return [service for service in self.services if service.name not in self.started]
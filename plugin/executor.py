@@ -0,0 +1,155 @@
+import subprocess
+import threading
+import time
+
+try:
+	from queue import Queue, Empty
+except ImportError:
+	from Queue import Queue, Empty
+
+# Executors run shell commands and timers for ServiceControllerCore. Every
+# executor offers the same three calls, shaped after the enigma2 API:
+#   run(cmd, callback, extra_args)     callback(result, retval, extra_args), as Console.ePopen
+#   stream(cmd, datacallback, closedcallback)   closedcallback(retval), as eConsoleAppContainer
+#   timer(callback)                    object with start(ms, singleshot) and stop(), as eTimer
+# Callbacks always arrive on the thread that drives the executor, so the
+# controller never needs locking. ConsoleExecutor (servicecenter.py) drives enigma2;
+# the two below run the same controller on a plain Linux host.
+
+def decode(data):
+	if not isinstance(data, str):
+		data = data.decode("utf-8", "replace")
+	return data
+
+class Timer():
+
+	def __init__(self, executor, callback):
+		self.executor = executor
+		self.callback = callback
+		self.handle = None
+
+	def start(self, ms, singleshot=False):
+		self.stop()
+		self.handle = self.executor.schedule(ms / 1000.0, self.fire, singleshot and 0 or ms / 1000.0)
+
+	def fire(self, interval):
+		self.handle = None
+		if interval:
+			self.handle = self.executor.schedule(interval, self.fire, interval)
+		self.callback()
+
+	def stop(self):
+		if self.handle is not None:
+			self.executor.cancel(self.handle)
+			self.handle = None
+
+# worker threads run the commands, completions are queued and dispatched by
+# poll() / runUntilIdle() on the caller's thread
+class ThreadExecutor():
+
+	def __init__(self, workers=4):
+		self.commands = Queue()
+		self.completions = Queue()
+		self.timers = {}				# handle -> (deadline, callback, argument)
+		self.handles = 0
+		self.pending = 0
+		for i in range(workers):
+			worker = threading.Thread(target=self.work)
+			worker.daemon = True
+			worker.start()
+
+	def work(self):
+		while True:
+			(cmd, callback, datacallback) = self.commands.get()
+			try:
+				process = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+			except OSError:
+				self.completions.put((callback, ("", -1), True))
+				continue
+			if datacallback is None:
+				result = decode(process.communicate()[0])
+				self.completions.put((callback, (result, process.returncode), True))
+				continue
+			for data in iter(lambda: process.stdout.readline(), b""):
+				self.completions.put((datacallback, (decode(data),), False))
+			self.completions.put((callback, ("", process.wait()), True))
+
+	def run(self, cmd, callback, extra_args=None):
+		self.pending += 1
+		self.commands.put((cmd, lambda result, retval: callback(result, retval, extra_args), None))
+
+	def stream(self, cmd, datacallback, closedcallback):
+		self.pending += 1
+		self.commands.put((cmd, lambda result, retval: closedcallback(retval), datacallback))
+
+	def timer(self, callback):
+		return Timer(self, callback)
+
+	def schedule(self, delay, callback, argument):
+		self.handles += 1
+		self.timers[self.handles] = (time.time() + delay, callback, argument)
+		return self.handles
+
+	def cancel(self, handle):
+		self.timers.pop(handle, None)
+
+	def poll(self, timeout=0):				# dispatch due timers and finished commands
+		now = time.time()
+		for (handle, (deadline, callback, argument)) in sorted(self.timers.items(), key=lambda item: item[1][0]):
+			if deadline <= now and handle in self.timers:
+				del self.timers[handle]
+				callback(argument)
+		if self.timers:
+			timeout = min(timeout, max(0, min(entry[0] for entry in self.timers.values()) - time.time()))
+		try:
+			(callback, args, final) = self.completions.get(timeout=timeout) if timeout > 0 else self.completions.get_nowait()
+		except Empty:
+			return
+		if final:
+			self.pending -= 1
+		callback(*args)
+
+	def runUntilIdle(self, timeout=None):			# True once no command or timer is left
+		end = timeout is not None and time.time() + timeout
+		while self.pending or self.timers or not self.completions.empty():
+			if end and time.time() > end:
+				return False
+			self.poll(0.05)
+		return True
+
+# asyncio loop as the driver: commands run in the loop's default thread pool,
+# completions and timers are delivered by the loop itself
+class AsyncioExecutor():
+
+	def __init__(self, loop=None):
+		import asyncio
+		self.loop = loop or asyncio.get_event_loop()
+
+	def execute(self, cmd, datacallback=None):
+		try:
+			process = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+		except OSError:
+			return ("", -1)
+		if datacallback is None:
+			result = decode(process.communicate()[0])
+			return (result, process.returncode)
+		for data in iter(lambda: process.stdout.readline(), b""):
+			self.loop.call_soon_threadsafe(datacallback, decode(data))
+		return ("", process.wait())
+
+	def run(self, cmd, callback, extra_args=None):
+		future = self.loop.run_in_executor(None, self.execute, cmd)
+		future.add_done_callback(lambda future: callback(future.result()[0], future.result()[1], extra_args))
+
+	def stream(self, cmd, datacallback, closedcallback):
+		future = self.loop.run_in_executor(None, self.execute, cmd, datacallback)
+		future.add_done_callback(lambda future: closedcallback(future.result()[1]))
+
+	def timer(self, callback):
+		return Timer(self, callback)
+
+	def schedule(self, delay, callback, argument):
+		return self.loop.call_later(delay, callback, argument)
+
+	def cancel(self, handle):
+		handle.cancel()
@@ -0,0 +1,56 @@
+import os
+import shutil
+import tempfile
+
+BACKUPS = 3			# filename.bak.1 is the newest backup
+
+def rotateBackups(filename, backups):
+	for index in range(backups - 1, 0, -1):
+		older = "%s.bak.%d" % (filename, index)
+		if os.path.exists(older):
+			os.rename(older, "%s.bak.%d" % (filename, index + 1))
+	newest = "%s.bak.1" % filename
+	if os.path.exists(newest):
+		os.remove(newest)
+	try:
+		os.link(filename, newest)		# the old inode survives the rename below
+	except OSError:
+		shutil.copy2(filename, newest)
+
+def syncDirectory(directory):
+	try:
+		fd = os.open(directory, os.O_RDONLY)
+	except OSError:
+		return
+	try:
+		os.fsync(fd)
+	except OSError:
+		pass
+	finally:
+		os.close(fd)
+
+# write to a temp file in the same directory, fsync and rename over the
+# original: readers see either the old or the new file, never a partial one
+def atomicWrite(filename, lines, backups=BACKUPS, binary=False):
+	directory = os.path.dirname(filename) or "."
+	(fd, tmpname) = tempfile.mkstemp(prefix=".%s." % os.path.basename(filename), dir=directory)
+	try:
+		with os.fdopen(fd, binary and "wb" or "w") as f:
+			f.writelines(lines)
+			f.flush()
+			os.fsync(f.fileno())
+		if os.path.exists(filename):
+			st = os.stat(filename)
+			os.chmod(tmpname, st.st_mode & 0o7777)
+			try:
+				os.chown(tmpname, st.st_uid, st.st_gid)
+			except OSError:
+				pass
+			if backups:
+				rotateBackups(filename, backups)
+		os.rename(tmpname, filename)
+	except:
+		if os.path.exists(tmpname):
+			os.remove(tmpname)
+		raise
+	syncDirectory(directory)
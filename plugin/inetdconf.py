@@ -0,0 +1,70 @@
+import os
+
+from .fileutil import atomicWrite
+
+# /etc/inetd.conf parsed into {service: enabled}; reparsed only when the
+# file changes, toggle() writes through and keeps the parsed state
+class InetdConfig():
+
+	def __init__(self, filename="/etc/inetd.conf"):
+		self.filename = filename
+		self.key = None
+		self.lines = []
+		self.services = {}
+
+	def fileKey(self):
+		st = os.stat(self.filename)
+		return (st.st_mtime, st.st_size)
+
+	def parseLine(self, line):					# -> (service, enabled) or None
+		enabled = not line.startswith("#")
+		fields = line.lstrip("#").split()
+		if len(fields) < 6 or fields[1] not in ("stream", "dgram", "raw", "rdm", "seqpacket"):
+			return None					# comment or malformed entry
+		return (fields[0], enabled)
+
+	def refresh(self):
+		try:
+			key = self.fileKey()
+		except OSError:
+			self.key = None
+			self.lines = []
+			self.services = {}
+			return
+		if key == self.key:
+			return
+		with open(self.filename, "r") as f:
+			self.lines = f.readlines()
+		services = {}
+		for line in self.lines:
+			entry = self.parseLine(line)
+			if entry is not None:
+				services[entry[0]] = services.get(entry[0], False) or entry[1]
+		self.services = services
+		self.key = key
+
+	def enabled(self, service):
+		self.refresh()
+		return self.services.get(service, False)
+
+	def toggle(self, service):					# -> False, nothing written, if service has no entry
+		self.refresh()
+		if service not in self.services:
+			return False
+		enable = not self.services[service]
+		lines = []
+		for line in self.lines:
+			entry = self.parseLine(line)
+			if entry is not None and entry[0] == service:
+				if enable and not entry[1]:
+					line = line[1:]
+				elif not enable and entry[1]:
+					line = "#" + line
+			lines.append(line)
+		atomicWrite(self.filename, lines)
+		self.lines = lines
+		self.services[service] = enable
+		self.key = self.fileKey()
+		return True
+
+inetdconf = InetdConfig()
@@ -0,0 +1,75 @@
+import os
+import errno
+import struct
+
+try:
+	import ctypes
+	import ctypes.util
+except ImportError:
+	ctypes = None
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+IN_CHANGES = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+EVENT = struct.Struct("iIII")		# wd, mask, cookie, len
+
+# minimal inotify binding through libc; raises OSError where inotify is not available
+class Inotify():
+
+	def __init__(self):
+		if ctypes is None:
+			raise OSError(errno.ENOSYS, "ctypes not available")
+		try:
+			self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+			self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+		except AttributeError:
+			raise OSError(errno.ENOSYS, "inotify not available")
+		if self.fd < 0:
+			raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+		self.watches = {}			# wd -> directory
+
+	def fileno(self):
+		return self.fd
+
+	def addWatch(self, path, mask=IN_CHANGES):
+		wd = self.libc.inotify_add_watch(self.fd, path.encode("utf-8"), mask)
+		if wd < 0:
+			raise OSError(ctypes.get_errno(), "inotify_add_watch failed", path)
+		self.watches[wd] = path
+		return wd
+
+	def read(self):					# -> [(directory, name, mask)]
+		events = []
+		while True:
+			try:
+				data = os.read(self.fd, 4096)
+			except OSError as e:
+				if e.errno in (errno.EAGAIN, errno.EINTR):
+					break
+				raise
+			if not data:
+				break
+			offset = 0
+			while offset + EVENT.size <= len(data):
+				(wd, mask, cookie, length) = EVENT.unpack_from(data, offset)
+				offset += EVENT.size
+				name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "replace")
+				offset += length
+				if wd in self.watches:
+					events.append((self.watches[wd], name, mask))
+		return events
+
+	def close(self):
+		if self.fd >= 0:
+			os.close(self.fd)
+			self.fd = -1
+			self.watches = {}
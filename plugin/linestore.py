@@ -0,0 +1,109 @@
+import os
+import bisect
+
+from .fileutil import atomicWrite
+
+CHUNK = 65536
+
+if str is bytes:					# python 2: enigma2 works on utf-8 byte strings
+	def decodeLine(data):
+		return data.rstrip(b"\r\n")
+	def encodeLine(text):
+		return text
+else:
+	def decodeLine(data):
+		return data.rstrip(b"\r\n").decode("utf-8", "replace")
+	def encodeLine(text):
+		return text.encode("utf-8")
+
+# Line access to a text file without loading it: one checkpoint (line,
+# offset) per 64 KiB chunk, lines are read on demand from the nearest
+# checkpoint. Edits stay in memory until save() streams the file through,
+# copying unchanged ranges as they are.
+class LineStore():
+
+	def __init__(self, filename):
+		self.filename = filename
+		self.index()
+
+	def index(self):
+		lines = [0]					# (0, 0) even for an empty file
+		offsets = [0]
+		count = 0
+		last = b"\n"
+		with open(self.filename, "rb") as f:
+			position = 0
+			while True:
+				chunk = f.read(CHUNK)
+				if not chunk:
+					break
+				start = chunk.find(b"\n") + 1
+				if position and 0 < start < len(chunk):
+					lines.append(count + 1)
+					offsets.append(position + start)
+				count += chunk.count(b"\n")
+				position += len(chunk)
+				last = chunk[-1:]
+		if last != b"\n":				# last line without newline
+			count += 1
+		self.checkpoints = lines
+		self.offsets = offsets
+		self.count = count
+		self.dirty = {}
+
+	def __len__(self):
+		return self.count
+
+	def seekLine(self, f, line):
+		checkpoint = bisect.bisect_right(self.checkpoints, line) - 1
+		f.seek(self.offsets[checkpoint])
+		for i in range(line - self.checkpoints[checkpoint]):
+			f.readline()
+
+	def lines(self, start, count):
+		count = max(0, min(count, self.count - start))
+		result = []
+		if count:
+			with open(self.filename, "rb") as f:
+				self.seekLine(f, start)
+				for line in range(start, start + count):
+					data = f.readline()
+					if line in self.dirty:
+						result.append(self.dirty[line])
+					else:
+						result.append(decodeLine(data))
+		return result
+
+	def setLine(self, line, text):
+		self.dirty[line] = text
+
+	def isChanged(self):
+		return bool(self.dirty)
+
+	def stream(self):
+		with open(self.filename, "rb") as f:
+			current = 0
+			for line in sorted(self.dirty):
+				checkpoint = bisect.bisect_right(self.checkpoints, line) - 1
+				if self.checkpoints[checkpoint] > current:	# copy whole chunks up to the checkpoint
+					remaining = self.offsets[checkpoint] - f.tell()
+					while remaining > 0:
+						data = f.read(min(CHUNK, remaining))
+						remaining -= len(data)
+						yield data
+					current = self.checkpoints[checkpoint]
+				while current < line:
+					yield f.readline()
+					current += 1
+				old = f.readline()
+				current += 1
+				yield encodeLine(self.dirty[line]) + (old.endswith(b"\n") and b"\n" or b"")
+			while True:
+				data = f.read(CHUNK)
+				if not data:
+					break
+				yield data
+
+	def save(self):
+		atomicWrite(self.filename, self.stream(), binary=True)
+		self.index()
@@ -0,0 +1,76 @@
+import os
+
+TCP_ESTABLISHED = "01"
+TCP_LISTEN = "0A"
+UDP_UNCONNECTED = "07"
+
+# one pass over /proc/net/{tcp,tcp6,udp,udp6}: local port -> listening
+# sockets and established connections
+class SocketTable():
+
+	def __init__(self, proc_root="/proc", services_file="/etc/services"):
+		self.proc_root = proc_root
+		self.services_file = services_file
+		self.services_key = None
+		self.portmap = {}
+		self.listening = {}
+		self.established = {}
+
+	def loadServices(self):
+		try:
+			st = os.stat(self.services_file)
+		except OSError:
+			return
+		key = (st.st_mtime, st.st_size)
+		if key == self.services_key:
+			return
+		portmap = {}
+		with open(self.services_file, "r") as f:
+			for line in f:
+				fields = line.split("#", 1)[0].split()
+				if len(fields) < 2 or "/" not in fields[1]:
+					continue
+				port = fields[1].split("/", 1)[0]
+				if not port.isdigit():
+					continue
+				for name in [fields[0]] + fields[2:]:
+					portmap.setdefault(name, set()).add(int(port))
+		self.portmap = portmap
+		self.services_key = key
+
+	def ports(self, name):
+		if name.isdigit():
+			return set([int(name)])
+		self.loadServices()
+		return self.portmap.get(name, set())
+
+	def scan(self):
+		listening = {}
+		established = {}
+		for table in ("tcp", "tcp6", "udp", "udp6"):
+			try:
+				f = open(os.path.join(self.proc_root, "net", table), "r")
+			except (IOError, OSError):
+				continue
+			with f:
+				next(f, None)				# header
+				for line in f:
+					fields = line.split()
+					if len(fields) < 4:
+						continue
+					port = int(fields[1].rsplit(":", 1)[1], 16)
+					st = fields[3]
+					if st == TCP_LISTEN or table.startswith("udp") and st == UDP_UNCONNECTED:
+						listening[port] = listening.get(port, 0) + 1
+					elif st == TCP_ESTABLISHED and table.startswith("tcp"):
+						established[port] = established.get(port, 0) + 1
+		self.listening = listening
+		self.established = established
+		return (listening, established)
+
+	def connections(self, name):				# -> (listening sockets, established connections)
+		listening = established = 0
+		for port in self.ports(name):
+			listening += self.listening.get(port, 0)
+			established += self.established.get(port, 0)
+		return (listening, established)
@@ -0,0 +1,70 @@
+import os
+
+# parsed /var/lib/opkg/status: package -> (installed, version), reparsed only
+# when the file's mtime or size changes
+class PackageIndex():
+
+	def __init__(self, statusfile="/var/lib/opkg/status", infodir="/var/lib/opkg/info"):
+		self.statusfile = statusfile
+		self.infodir = infodir
+		self.key = None
+		self.packages = {}
+
+	def parse(self, lines):
+		packages = {}
+		fields = {}
+		for line in lines:
+			if not line.strip():
+				self.addPackage(packages, fields)
+				fields = {}
+			elif not line[0].isspace() and ":" in line:
+				(field, value) = line.split(":", 1)
+				fields[field] = value.strip()
+		self.addPackage(packages, fields)
+		return packages
+
+	def addPackage(self, packages, fields):
+		if 'Package' in fields:
+			status = fields.get('Status', "installed").split()
+			installed = bool(status) and status[-1] == "installed"
+			packages[fields['Package']] = (installed, fields.get('Version', ""))
+
+	def refresh(self):
+		try:
+			st = os.stat(self.statusfile)
+		except OSError:
+			print ("[PackageIndex] could not read status file:", self.statusfile)
+			self.key = None
+			self.packages = {}
+			return False
+		key = (st.st_mtime, st.st_size)
+		if key == self.key:
+			return False
+		with open(self.statusfile, "r") as f:
+			self.packages = self.parse(f)
+		self.key = key
+		print ("[PackageIndex] packages:", len(self.packages))
+		return True
+
+	def update(self, packages):					# after an install: read only these packages' control files
+		for package in packages:
+			try:
+				with open(os.path.join(self.infodir, "%s.control" % package), "r") as f:
+					fields = self.parse(f)
+			except (IOError, OSError):
+				continue				# opkg keeps control files of installed packages only
+			if package in fields:
+				self.packages[package] = (True, fields[package][1])
+		try:
+			st = os.stat(self.statusfile)
+			self.key = (st.st_mtime, st.st_size)
+		except OSError:
+			pass
+
+	def installed(self, package):
+		return self.packages.get(package, (False, ""))[0]
+
+	def version(self, package):
+		return self.packages.get(package, (False, ""))[1]
+
+packageindex = PackageIndex()
@@ -0,0 +1,24 @@
+import time
+
+# probe results shared by every ServiceController: screens opened in quick
+# succession reuse one snapshot per probe type instead of each rescanning
+class ProbeCache():
+
+	def __init__(self, ttl=0.5):
+		self.ttl = ttl
+		self.entries = {}			# key -> (time, value)
+
+	def get(self, key, probe, ttl=None):
+		if ttl is None:
+			ttl = self.ttl
+		entry = self.entries.get(key)
+		if entry is not None and time.time() - entry[0] < ttl:
+			return entry[1]
+		value = probe()
+		self.entries[key] = (time.time(), value)
+		return value
+
+	def invalidate(self):
+		self.entries = {}
+
+probecache = ProbeCache()
@@ -0,0 +1,84 @@
+import os
+
+# (proc root, service name) -> (pid, start time) of a process found before;
+# confirming a pin is one read of /proc/<pid>/stat instead of a full scan,
+# and the start time tells a reused pid from the original process
+pins = {}
+
+# one pass over /proc: daemon name (comm and argv[0] basename) -> pids
+class ProcTable():
+
+	def __init__(self, root="/proc"):
+		self.root = root
+		self.index = {}
+
+	def readEntry(self, pid, name):
+		try:
+			with open(os.path.join(self.root, pid, name), "r") as f:
+				return f.read()
+		except (IOError, OSError, ValueError):
+			return ""
+
+	def names(self, pid):
+		names = set()
+		comm = self.readEntry(pid, "comm").strip()
+		if comm:
+			names.add(comm)
+		cmdline = self.readEntry(pid, "cmdline")
+		if cmdline:
+			command = cmdline.split("\0", 1)[0].split(None, 1)
+			if command:
+				command = os.path.basename(command[0])
+				if command.endswith(":"):				# avahi-daemon(:)
+					command = command[:-1]
+				if command:
+					names.add(command)
+		return names
+
+	def scan(self):
+		index = {}
+		try:
+			entries = os.listdir(self.root)
+		except OSError:
+			print ("[ProcTable] could not read proc root:", self.root)
+			entries = []
+		for pid in entries:
+			if not pid.isdigit():
+				continue
+			for name in self.names(pid):
+				index.setdefault(name, []).append(int(pid))
+		self.index = index
+		return index
+
+	def pids(self, name):
+		return self.index.get(name, [])
+
+	def running(self, name):
+		return name in self.index
+
+	def startTime(self, pid):					# -> start time in clock ticks since boot, None if gone
+		stat = self.readEntry(str(pid), "stat")
+		fields = stat[stat.rfind(")") + 2:].split()
+		if len(fields) < 20 or fields[0] == "Z":			# a zombie has already exited
+			return None
+		return fields[19]
+
+	def pin(self, name, pid):
+		start = self.startTime(pid)
+		if start is None:
+			self.unpin(name)
+			return False
+		pins[(self.root, name)] = (pid, start)
+		return True
+
+	def unpin(self, name):
+		pins.pop((self.root, name), None)
+
+	def pinned(self, name, pid=None):				# -> pinned pid if that process still runs
+		pin = pins.get((self.root, name))
+		if pin is None or pid is not None and pin[0] != pid:
+			return None
+		if self.startTime(pin[0]) != pin[1]:
+			self.unpin(name)
+			return None
+		return pin[0]
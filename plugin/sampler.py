@@ -0,0 +1,72 @@
+import os
+import time
+
+from collections import deque
+
+SAMPLES = 20			# ring buffer length per service
+MIN_INTERVAL = 2.0		# seconds, a service is never read more often
+
+# CPU and memory of a service's processes from /proc/<pid>/stat and statm;
+# CPU% is the tick delta between two samples of the same processes
+class ResourceSampler():
+
+	def __init__(self, proc_root="/proc", samples=SAMPLES):
+		self.proc_root = proc_root
+		self.samples = samples
+		self.ticks = os.sysconf("SC_CLK_TCK")
+		self.pagesize = os.sysconf("SC_PAGE_SIZE")
+		self.last = {}			# name -> (time, {pid: (starttime, cputicks)})
+		self.history = {}		# name -> deque([(time, cpu%, rss bytes)])
+
+	def readProcess(self, pid):			# -> (starttime, cputicks, rss bytes)
+		try:
+			with open(os.path.join(self.proc_root, str(pid), "stat"), "r") as f:
+				fields = f.read().rsplit(")", 1)[1].split()
+			with open(os.path.join(self.proc_root, str(pid), "statm"), "r") as f:
+				rss = int(f.read().split()[1]) * self.pagesize
+		except (IOError, OSError, IndexError, ValueError):
+			return None
+		return (int(fields[19]), int(fields[11]) + int(fields[12]), rss)
+
+	def sample(self, name, pids):				# -> (cpu% or None, rss bytes) or None
+		now = time.time()
+		last = self.last.get(name)
+		if last is not None and now - last[0] < MIN_INTERVAL:
+			return self.latest(name)
+		processes = {}
+		cpu = 0
+		rss = 0
+		for pid in pids:
+			process = self.readProcess(pid)
+			if process is None:
+				continue
+			(starttime, cputicks, pidrss) = process
+			processes[pid] = (starttime, cputicks)
+			rss += pidrss
+			if last is not None and last[1].get(pid, (None,))[0] == starttime:	# same process as before
+				cpu += cputicks - last[1][pid][1]
+		if not processes:
+			self.last.pop(name, None)
+			return None
+		percent = None
+		if last is not None:
+			percent = 100.0 * cpu / self.ticks / (now - last[0])
+		self.last[name] = (now, processes)
+		if name not in self.history:
+			self.history[name] = deque(maxlen=self.samples)
+		self.history[name].append((now, percent, rss))
+		return (percent, rss)
+
+	def latest(self, name):
+		history = self.history.get(name)
+		if history:
+			return history[-1][1:]
+		return None
+
+	def average(self, name):			# mean CPU% over the ring buffer
+		values = [percent for (t, percent, rss) in self.history.get(name, ()) if percent is not None]
+		if values:
+			return sum(values) / len(values)
+		return None
+
+resourcesampler = ResourceSampler()
@@ -0,0 +1,911 @@
+from enigma import eTimer, eConsoleAppContainer, eSocketNotifier
+
+from Screens.Screen import Screen
+from Screens.MessageBox import MessageBox
+from Screens.VirtualKeyBoard import VirtualKeyBoard
+from Screens.ChoiceBox import ChoiceBox
+
+from Components.Label import Label
+from Components.ActionMap import ActionMap
+from Components.Sources.StaticText import StaticText
+from Components.config import config, getConfigListEntry, ConfigYesNo, NoSave
+from Components.ConfigList import ConfigListScreen
+from Components.Pixmap import Pixmap, MultiPixmap
+from Components.Sources.List import List
+from Components.Console import Console
+from Components.MultiContent import MultiContentEntryText, MultiContentEntryPixmapAlphaTest
+from Components.MenuList import MenuList
+
+from Tools.Directories import fileExists, resolveFilename, SCOPE_PLUGINS, SCOPE_CURRENT_PLUGIN, SCOPE_CURRENT_SKIN
+from Tools.LoadPixmap import LoadPixmap
+
+from .bootlinks import bootlinks
+from .inetdconf import inetdconf
+from .linestore import LineStore
+from .sampler import resourcesampler
+from .watchdog import ServiceWatchdog, userAction
+from .api import ServiceAPI, APIServer
+from .catalog import ServiceCatalog, PROBE_PROCESS, PROBE_PIDFILE, PROBE_INETD
+from .watcher import StateWatcher
+from .probecache import probecache
+from .depgraph import requiredClosure
+from .controller import ServiceControllerCore, BATCH_SKIPPED, ACTION_READY_TIMEOUT
+from .warmup import CacheWarmer
+from .plugin import updateMenus
+
+import sys
+import os
+
+from select import POLLIN
+
+API_SOCKET = "/var/run/servicemanager.sock"
+
+SAMPLE_INTERVAL = 3000			# ms, resource display refresh
+
+WARMUP_INSTALL_POLL = 1000		# ms, how often background warm-up results are picked up
+
+EDIT_WINDOW = 200			# config editor lines held in the list
+EDIT_PAGE = 20
+
+servicecatalog = ServiceCatalog(resolveFilename(SCOPE_PLUGINS, "SystemPlugins/ServiceManager/services.xml"), "/etc/enigma2/servicemanager.d", "/etc/enigma2/servicemanager.cache")
+
+def loadPixmaps():
+	pixmaps = {"div": LoadPixmap(cached=True, path=resolveFilename(SCOPE_CURRENT_SKIN, "skin_default/div-h.png"))}
+	for png in ("installable", "installed", "running", "pause", "stopped"):
+		pixmaps[png] = LoadPixmap(cached=True, path=resolveFilename(SCOPE_CURRENT_PLUGIN, "SystemPlugins/ServiceManager/icons/%s.png" % png))
+	return pixmaps
+
+def configEnabled(service):
+	return inetdconf.enabled(service)		# startAtBoot and ready to request
+
+def enableDisable(service):
+	return inetdconf.toggle(service)
+
+def resourceText(service):
+	sample = resourcesampler.latest(service.name)
+	if sample is None:
+		return ""
+	(percent, rss) = sample
+	text = _("mem %.1f MiB") % (rss / 1048576.0)
+	if percent is not None:
+		text = _("cpu %.1f%% (avg %.1f%%)") % (percent, resourcesampler.average(service.name)) + "  " + text
+	return text
+
+# enigma2 driver for ServiceControllerCore, see executor.py
+class ConsoleExecutor():
+
+	def __init__(self):
+		self.Console = Console()
+		self.containers = []
+
+	def run(self, cmd, callback, extra_args=None):
+		self.Console.ePopen(cmd, callback, extra_args)
+
+	def stream(self, cmd, datacallback, closedcallback):
+		container = eConsoleAppContainer()
+		def closed(retval):
+			self.containers.remove(container)
+			closedcallback(retval)
+		container.dataAvail.append(datacallback)
+		container.appClosed.append(closed)
+		self.containers.append(container)
+		if container.execute(cmd):
+			closed(-1)
+
+	def timer(self, callback):
+		timer = eTimer()
+		timer.callback.append(callback)
+		return timer
+
+class ServiceController(ServiceControllerCore):
+
+	def __init__(self, proc_root="/proc", executor=None):
+		probecache.ttl = config.plugins.servicemanager.probeCacheTime.value / 1000.0
+		ServiceControllerCore.__init__(self, executor or ConsoleExecutor(), proc_root)
+
+class ServiceControlPanel(Screen, ConfigListScreen):
+
+	skin = """
+  <screen name="ServiceControlPanel" position="fill" flags="wfNoBorder">
+    <panel name="PigTemplate"/>
+    <panel name="ButtonTemplate_RGYBS"/>
+    <widget name="version" position="590,120" size="500,40" font="Regular;24" />
+    <widget name="statetext" position="590,180" size="100,40" font="Regular;24" />
+    <widget name="statepic" pixmaps="/usr/lib/enigma2/python/Plugins/SystemPlugins/ServiceManager/icons/stopped.png,/usr/lib/enigma2/python/Plugins/SystemPlugins/ServiceManager/icons/pause.png,/usr/lib/enigma2/python/Plugins/SystemPlugins/ServiceManager/icons/running.png" position="750,180" zPosition="10" size="40,40" transparent="1" alphatest="on"/>
+    <widget name="connections" position="810,180" size="380,40" font="Regular;24" />
+    <widget name="conffile" position="590,240" size="600,40" font="Regular;24" />
+    <widget name="resources" position="590,280" size="600,40" font="Regular;24" />
+    <widget name="config" position="590,320" size="500,60" font="Regular;24" selectionPixmap="PLi-HD/buttons/sel.png" scrollbarMode="showOnDemand" />
+    <widget source="menuinfo" render="Label" position="85,540" size="450,120" backgroundColor="darkgrey" transparent="1" font="Regular;20" />
+  </screen>"""
+
+	def __init__(self, session, service):
+		Screen.__init__(self, session)
+		self.session = session
+		self.service = service
+		self.service_name = self.service.name
+		self.setup_title = _("%s Control Panel" % self.service_name)
+		print ("[ServiceControlPanel] open service panel:", self.service)
+		self.list = [ ]
+		ConfigListScreen.__init__(self, self.list, session = session)
+		self.startAtBootEntry = None
+		self.start_at_boot = False
+#"SetupActions", "MenuActions", 
+		self["actions"] = ActionMap(["OkCancelActions", "ColorActions"],
+			{
+				"ok": self.applyBootSetting,
+				"cancel": self.keyCancel,
+				"red": self.stopService,
+				"green": self.startService,
+				"yellow": self.restartService,
+				"blue": self.editConfigFile,
+			}, -2)
+
+		self["version"] = Label("Version:   %s" % self.service.version)
+		self["statetext"] = Label(_("State:"))
+		self["conffile"] = Label("")
+		self["connections"] = Label("")
+		self["resources"] = Label("")
+		self["statepic"] = MultiPixmap()
+		self["statepic"].hide()
+
+		self["key_red"] = StaticText(_("Stop"))
+		self["key_green"] = StaticText(_("Start"))
+		self["key_yellow"] = StaticText(_("Restart"))
+		self["key_blue"] = StaticText("")
+
+		self["menuinfo"] = StaticText("")
+		self.configeditor = False
+		if self.service.conffile:
+			self.configeditor = True
+			self.config_file = False
+			self["conffile"].setText(_("Config file:  %s") % self.service.conffile)
+			self["key_blue"] = StaticText(_("Config"))
+			try:
+				open(self.service.conffile, "r").read()
+				self.config_file = True
+			except:
+				pass
+
+		self.inetdctrl = False
+		if self.service.inetd:
+			self.inetdctrl = True
+			self.inetdservice = self.service.inetd
+
+		self.sc = ServiceController()
+		self.msg = None
+		self.action_running = False
+		self.closed = False
+		self.onClose.append(self.panelClosed)
+		self.sample_timer = eTimer()
+		self.sample_timer.callback.append(self.updateResources)
+		self.onClose.append(self.sample_timer.stop)
+
+		self.getServiceBootSetting()
+		self.onLayoutFinish.append(self.layoutFinished)
+
+	def layoutFinished(self):
+		self.setTitle(self.setup_title)
+		self.serviceStateChanged(self.service)
+		self.updateInfoLabel()
+		self.updateResources()
+		self.sample_timer.start(SAMPLE_INTERVAL)
+
+	def updateResources(self):
+		self.sc.sampleResources(self.service)
+		self["resources"].setText(self.service.state and resourceText(self.service) or "")
+
+	def updateStatePic(self, state):
+		if state is None:
+			self["statepic"].setPixmapNum(1)
+		elif state:
+			self["statepic"].setPixmapNum(2)
+		else:
+			self["statepic"].setPixmapNum(0)
+		self["statepic"].show()
+
+	def serviceStateChanged(self, service):
+		print ("[ServiceControlPanel] service: %s  state: %s" % (self.service_name, service.state))
+		self.updateStatePic(service.state)
+		if self.inetdctrl:
+			self["connections"].setText(_("%d active connections") % service.connections)
+
+	def getServiceBootSetting(self):
+		if self.inetdctrl:
+			self.start_at_boot = configEnabled(self.inetdservice)
+		elif self.service.initscript:
+			bootlinks.refresh()
+			self.start_at_boot = bootlinks.enabled(self.service.initscript)
+		self.updateBootConfigEntry()
+
+	def updateBootConfigEntry(self):
+		self.list = [ ]
+		self.startAtBootEntry = NoSave(ConfigYesNo(default=self.start_at_boot))
+		self.list.append(getConfigListEntry(_("Start %s at boot") % self.service_name, self.startAtBootEntry))
+		self["config"].list = self.list
+		self["config"].l.setList(self.list)
+
+	def updateInfoLabel(self):
+		text = ""
+		if self.configeditor:
+			if self.config_file is True:
+				text = _("Press blue button to edit config file") + "\n\n"
+			else:
+				text = _("Service config file not found!") + "\n\n"
+		if self["config"].isChanged():
+			text += _("Press OK button to save boot config")
+		self["menuinfo"].setText(text)
+
+	def keyLeft(self):
+		ConfigListScreen.keyLeft(self)
+		self.updateInfoLabel()
+
+	def keyRight(self):
+		ConfigListScreen.keyRight(self)
+		self.updateInfoLabel()
+
+	def startStopService(self, action):
+		if self.action_running:
+			return
+		self.action = action
+		self.action_running = True
+		userAction(self.service_name, action)
+		action_msg = _("Service: %s\nAction: %s" % (self.service_name, action))
+		self.msg = self.session.openWithCallback(self.actionMsgClosed, MessageBox, action_msg, MessageBox.TYPE_INFO)	# OK hides it, the result still shows
+		self.msg.setTitle(self.setup_title)
+		self.sc.runAction(self.service, action, self.actionFinished, self.actionStep)
+
+	def actionMsgClosed(self, result=None):
+		self.msg = None
+
+	def actionStep(self, step):
+		(label, retval, command_time, ready_time, ok) = step
+		if self.closed:
+			return
+		self.serviceStateChanged(self.service)
+		if self.msg is not None and ok:
+			self.msg["text"].setText(self.msg["text"].getText() + "\n" + _("%s: %.1fs") % (label, command_time + (ready_time or 0)))
+
+	def actionFinished(self, ok, steps, elapsed):				# closes the progress box once the service really got there
+		self.action_running = False
+		if self.msg is not None:
+			self.msg.close()
+		if self.closed:
+			return
+		self.serviceStateChanged(self.service)
+		self.updateResources()
+		if ok:
+			self.msg = self.session.open(MessageBox, _("Done in %.1fs.") % elapsed, MessageBox.TYPE_INFO, timeout = 2)
+		elif not steps:
+			self.msg = self.session.open(MessageBox, _("No %s command configured for %s.") % (self.action, self.service_name), MessageBox.TYPE_ERROR, timeout = 5)
+		else:
+			(label, retval, command_time, ready_time, ok) = steps[-1]
+			if retval:
+				reason = _("%s returned %s") % (label, retval)
+			else:
+				reason = _("%s: service state not reached within %ds") % (label, ACTION_READY_TIMEOUT)
+			self.msg = self.session.open(MessageBox, _("Error. Could not %s %s") % (self.action, self.service_name) + "\n" + reason, MessageBox.TYPE_ERROR, timeout = 5)
+		self.msg.setTitle(self.setup_title)
+		self.msg = None
+
+	def panelClosed(self):
+		self.closed = True
+
+	def startService(self):
+		if self.service.state:
+			self.startStopService("restart")
+		else:
+			self.startStopService("start")
+
+	def stopService(self):
+		if self.service.state or self.inetdctrl and configEnabled(self.inetdservice):
+			self.startStopService("stop")
+
+	def restartService(self):
+		self.startStopService("restart")
+
+	def saveBootSetting(self):					# -> False if the setting could not be changed
+		must_start_at_boot = self["config"].getCurrent()[1].value
+		self.sc.setBoot(self.service, must_start_at_boot)
+		return self.service.boot == must_start_at_boot
+
+	def applyBootSetting(self):
+		if self["config"].isChanged():
+			if self.saveBootSetting():
+				self.session.open(MessageBox, _("Boot startup setting saved."), MessageBox.TYPE_INFO, timeout = 3)
+			else:
+				self.session.open(MessageBox, _("No %s entry for %s in /etc/inetd.conf, boot setting not changed.") % (self.inetdservice, self.service_name), MessageBox.TYPE_ERROR, timeout = 5)
+			self.close(self.service.state)
+
+	def cancelConfirm(self, confirmed):
+		if confirmed:
+			self.close(self.service.state)
+
+	def keyCancel(self):
+		if self["config"].isChanged():
+			self.session.openWithCallback(self.cancelConfirm, MessageBox, _("Really close without saving settings?"), MessageBox.TYPE_YESNO, timeout = 10, default = True)
+		else:
+			self.close(self.service.state)
+		
+	def editConfigFile(self):
+		if self.service.conffile and self.config_file is True:
+			self.session.open(ServiceConfigEdit, self.service)
+
+class ServiceConfigEdit(Screen):
+
+	skin = """
+  <screen name="ServiceConfigEdit" position="fill" flags="wfNoBorder">
+    <panel name="PigTemplate"/>
+    <panel name="ButtonTemplate_RGS"/>
+    <widget name="list" position="540,110" size="660,510" font="Regular;20" />
+    <widget source="menuinfo" render="Label" position="85,540" size="450,40" backgroundColor="darkgrey" transparent="1" font="Regular;20" />
+  </screen>"""
+
+	def __init__(self, session, service):
+		Screen.__init__(self, session)
+		self.service = service
+		self.list = []					# the lines of the current window only
+		self.top = 0					# file line of the first window line
+
+		try:
+			self.store = LineStore(self.service.conffile)
+			self.list = self.store.lines(0, EDIT_WINDOW)
+		except (IOError, OSError):
+			print ("[ServiceConfigEdit] could not read config file:", self.service.conffile)
+			self.store = None
+			self.list.append("Error reading config file: %s" % self.service.conffile)
+
+		title = _("%s Config Editor") % self.service.name
+		self.setTitle(title)
+
+		self["list"] = MenuList(list=self.list, enableWrapAround=True)
+
+		self["actions"] = ActionMap(["OkCancelActions", "ColorActions", "DirectionActions"],
+			{
+				"ok": self.editLine,
+				"cancel": self.close,
+				"red": self.close,
+				"green": self.save,
+				"up": self.keyUp,
+				"down": self.keyDown,
+				"left": self.keyPageUp,
+				"right": self.keyPageDown,
+			}, -2)
+
+		self["key_red"] = StaticText(_("Close"))
+		self["key_green"] = StaticText(_("Save"))
+
+		self["menuinfo"] = StaticText(_("Press OK to edit config line"))
+
+	def currentLine(self):
+		return self.top + self["list"].getSelectionIndex()
+
+	def moveToLine(self, line):
+		if self.store is None or not len(self.store):
+			return
+		line %= len(self.store)
+		if not self.top <= line < self.top + len(self.list):		# load the window around the line
+			self.top = max(0, min(line - EDIT_WINDOW // 2, len(self.store) - EDIT_WINDOW))
+			self.list = self.store.lines(self.top, EDIT_WINDOW)
+			self["list"].setList(self.list)
+		self["list"].moveToIndex(line - self.top)
+
+	def keyUp(self):
+		self.moveToLine(self.currentLine() - 1)
+
+	def keyDown(self):
+		self.moveToLine(self.currentLine() + 1)
+
+	def keyPageUp(self):
+		line = self.currentLine()
+		self.moveToLine(line > 0 and max(0, line - EDIT_PAGE) or -1)
+
+	def keyPageDown(self):
+		if self.store is None:
+			return
+		line = self.currentLine()
+		self.moveToLine(line < len(self.store) - 1 and min(len(self.store) - 1, line + EDIT_PAGE) or 0)
+
+	def editLine(self):
+		if self.store is None:
+			return
+		self.current = self["list"].getCurrent() or ""
+		self.session.openWithCallback(self.editLineCallback, VirtualKeyBoard, title="Edit text line", text=self.current)
+
+	def editLineCallback(self, linechanged):
+		if linechanged is not None and linechanged != self.current:
+			index = self["list"].getSelectionIndex()
+			self.store.setLine(self.top + index, linechanged)
+			self.list[index] = linechanged
+			self["list"].l.invalidateEntry(index)
+
+	def save(self):
+		if self.store is None or not self.store.isChanged():
+			return
+		self.store.save()
+		self.session.open(MessageBox, _("Config file changes saved."), MessageBox.TYPE_INFO, timeout = 3)
+
+class ServiceCenterSetup(Screen, ConfigListScreen):
+
+	skin = """
+  <screen name="ServiceCenterSetup" position="fill" title="Service Center Setup" flags="wfNoBorder">
+    <panel name="PigTemplate"/>
+    <panel name="ButtonTemplate_RGS"/>
+    <widget name="config" position="590,110" size="600,510" selectionPixmap="PLi-HD/buttons/sel.png" scrollbarMode="showOnDemand" />
+  </screen>"""
+
+	def __init__(self, session):
+		Screen.__init__(self, session)
+		self.session = session
+
+		self.list = [ ]
+		ConfigListScreen.__init__(self, self.list, session = session)
+		self.setup_title = _("Service Control Center Setup")
+
+		self["actions"] = ActionMap(["SetupActions", "MenuActions"],
+			{
+				"cancel": self.keyCancel,
+				"save": self.saveSettings,
+				"menu": self.keyCancel,
+			}, -2)
+
+		self["key_red"] = StaticText(_("Close"))
+		self["key_green"] = StaticText(_("Save"))
+
+		self.createSetup()
+		self.onLayoutFinish.append(self.layoutFinished)
+
+	def layoutFinished(self):
+		self.setTitle(self.setup_title)
+
+	def createSetup(self):
+		self.list = [ ]
+		self.list.append(getConfigListEntry(_("show service manager in setup menu"), config.plugins.servicemanager.onSetupMenu))
+		self.list.append(getConfigListEntry(_("show service manager in extensions menu"), config.plugins.servicemanager.onExtensionsMenu))
+		self.list.append(getConfigListEntry(_("show only running services"), config.plugins.servicemanager.showOnlyRunning))
+		self.list.append(getConfigListEntry(_("parallel service actions"), config.plugins.servicemanager.batchConcurrency))
+		self.list.append(getConfigListEntry(_("reuse state probes for (ms)"), config.plugins.servicemanager.probeCacheTime))
+		self.list.append(getConfigListEntry(_("restart watched services that died"), config.plugins.servicemanager.watchdog))
+		self.list.append(getConfigListEntry(_("watchdog check interval (s)"), config.plugins.servicemanager.watchdogInterval))
+		self.list.append(getConfigListEntry(_("control socket %s") % API_SOCKET, config.plugins.servicemanager.api))
+		self.list.append(getConfigListEntry(_("prepare service list in background"), config.plugins.servicemanager.warmup))
+		self["config"].list = self.list
+		self["config"].l.setSeperation(400)
+		self["config"].l.setList(self.list)
+
+	def apply(self, confirmed):
+		if not confirmed:
+			self.close()
+		self.saveAll()
+		updateWatchdog()
+		updateAPI()
+		updateWarmup()
+		self.close(True)
+		updateMenus()
+
+	def saveSettings(self):
+		if self["config"].isChanged():
+			self.session.openWithCallback(self.apply, MessageBox, _("Apply new settings?"), MessageBox.TYPE_YESNO, timeout = 20, default = True)
+		else:
+			self.close()
+			
+class ServiceCenter(Screen):
+
+	skin = """
+  <screen name="ServiceCenter" position="fill" title="Service Control Center" flags="wfNoBorder">
+    <panel name="PigTemplate"/>
+    <panel name="KeyMenuTemplate"/>
+    <panel name="ButtonTemplate_RGYBS"/>   
+    <widget source="list" render="Listbox" position="540,145" size="660,420" zPosition="3" transparent="1" scrollbarMode="showOnDemand" selectionPixmap="PLi-HD/buttons/sel.png">
+	<convert type="TemplatedMultiContent">
+		{"template": [
+		MultiContentEntryText(pos = (5,1), size = (360,24), font=0, flags = RT_HALIGN_LEFT, text = 0), # index 0 is the service name
+		MultiContentEntryText(pos = (370,3), size = (145,24), font=1, flags = RT_HALIGN_RIGHT, text = 6), # index 6 is the start at boot text
+	 	MultiContentEntryText(pos = (5,31), size = (520,24), font=1, flags = RT_HALIGN_LEFT, text = 1), # index 1 is the service description
+		MultiContentEntryPixmapAlphaTest(pos = (520,6), size = (48,48), png = 2), # index 2 is the installed status pixmap
+		MultiContentEntryPixmapAlphaTest(pos = (585,20), size = (35,20), png = 3), # index 3 is the running state pixmap
+		MultiContentEntryPixmapAlphaTest(pos = (0,57), size = (630,2), png = 4), # index 4 is the div pixmap
+		],
+		"fonts": [gFont("Regular",22),gFont("Regular",18)],
+		"itemHeight": 60
+		}
+      </convert>
+    </widget>
+    <widget source="status" render="Label" position="85,385" size="450,140" backgroundColor="darkgrey" transparent="1" font="Regular;20" />
+    <widget source="menuinfo" render="Label" position="85,540" size="450,40" backgroundColor="darkgrey" transparent="1" font="Regular;20" />
+  </screen>"""
+
+	def __init__(self, session):
+		Screen.__init__(self, session)
+		self.session = session
+
+		self.list = []
+		self.serviceList = []
+		self.marked = set()
+		self.entries = {}				# (name, status, state, boot, marked) -> list entry
+		self.loadPixmaps()
+		self.running_view = config.plugins.servicemanager.showOnlyRunning.value
+		self["list"] = List(self.list)
+
+		self["actions"] = ActionMap(["OkCancelActions", "ColorActions", "SetupActions", "MenuActions"],
+		{
+			"ok": self.selectService,
+			"cancel": self.close,
+			"red": self.close,
+			"yellow": self.switchList,
+			"green": self.keyGreen,
+			"blue": self.markService,
+			"menu": self.pluginsetup,
+		}, -2)
+
+		self["key_red"] = StaticText(_("Close"))
+		self["key_green"] = StaticText("OK")
+		self["key_yellow"] = StaticText("View running")
+		self["key_blue"] = StaticText(_("Select"))
+		self["status"] = StaticText("")
+		self["menuinfo"] = StaticText(_("Press MENU for plugin setup"))
+
+		self.sc = ServiceController()
+		self.watcher = StateWatcher(self.sc)
+		self.onClose.append(self.watcher.stop)
+		self.sample_timer = eTimer()
+		self.sample_timer.callback.append(self.updateResources)
+		self.onClose.append(self.sample_timer.stop)
+
+		self.createServiceList()
+		if len(self.serviceList):
+			self.checkServiceListStatus(self.serviceList)
+			self.getPkgInfo()
+			self.getBootInfo()
+			self.updateServiceListState()			
+			for service in self.serviceList:
+				self.watcher.watch(service, self.serviceStateChanged, timeout=None)
+
+		self["list"].onSelectionChanged.append(self.selectionChanged)
+
+	def selectionChanged(self):
+		self.sample_timer.stop()
+		current = self["list"].getCurrent()
+		if current is None:						# empty list or being rebuilt
+			self['status'].setText("")
+			return
+		self.updateStatus(current[5])
+		self.sample_timer.start(SAMPLE_INTERVAL, True)
+
+	def updateResources(self):
+		current = self["list"].getCurrent()
+		if current is None:
+			return
+		self.updateStatus(current[5])
+		self.sample_timer.start(SAMPLE_INTERVAL, True)
+
+	def updateStatus(self, current):
+		text = "Service %s" % current.name
+		if current.status:
+			text += "\n\n          >>  installed"
+			if current.state:
+				if current.probe == PROBE_INETD:
+					text += "\n          >>  %d active connections" % current.connections
+				else:
+					text += "\n          >>  running"
+					self.sc.sampleResources(current)
+					resources = resourceText(current)
+					if resources:
+						text += "\n          >>  " + resources
+			else:
+				if current.probe == PROBE_INETD and configEnabled(current.inetd):
+					text += "\n          >>  ready to requests"
+				else:
+					text += "\n          >>  not running"
+			if current.boot:
+				text += "\n          >>  starts at boot"
+			text += "\n\nPress OK to open %s control panel" % current.name
+		else:
+			text += " not installed!\n\nPress OK to install it now."
+		self['status'].setText(text)
+
+	def createServiceList(self):
+		try:
+			self.serviceList = servicecatalog.load()
+			print ("[ServiceManager] servicelist length:", len(self.serviceList))
+		except:
+			print ("[ServiceManager] could not read sm config file: 'services.xml'")
+
+	def checkServiceListStatus(self, services):
+		index = self.sc.packageindex
+		try:
+			index.refresh()
+		except:
+			print ("[ServiceManager] could not read status file: '%s'" % index.statusfile)
+		for srv in services:
+			srv.status = index.installed(srv.package)
+#			print ("[ServiceManager] service: %s  status: %s" % (srv.name , srv.status))
+
+	def getPkgInfo(self):
+		self.sc.packageInfo(self.serviceList)
+
+	def getBootInfo(self):
+		self.sc.bootInfo(self.serviceList)
+
+	def updateServiceListStateFinished(self, data):
+		if data:
+			self.serviceList = data
+			self.sc.checkSocketList([self.updateInetdStateFinished, [service for service in self.serviceList if service.probe == PROBE_INETD]])
+
+	def updateInetdStateFinished(self, data):
+		self.updateEntryList()
+
+	def serviceStateChanged(self, service):
+		self.updateEntryList()
+		self.selectionChanged()
+
+	def batchStateChanged(self, service):					# timed watch after a batch, the permanent one keeps serviceStateChanged
+		self.serviceStateChanged(service)
+
+	def updateServiceListState(self):
+		self.sc.checkProcList([self.updateServiceListStateFinished, self.serviceList])
+
+	def loadPixmaps(self):								# once per screen, the skin can not change while it is open
+		self.pixmaps = loadPixmaps()
+
+	def buildEntryComponent(self, service):
+		marked = service.name in self.marked
+		key = (service.name, service.status, service.state, service.boot, marked)
+		entry = self.entries.get(key)
+		if entry is not None and entry[5] is service:
+			return entry
+
+		status_png = "installable"
+		state_png = "stopped"
+		if service.status:
+			status_png = "installed"
+			if service.state:
+				state_png = "running"
+			elif service.state is None:
+				state_png = "pause"
+
+		boot_text = ""
+		if service.status and service.boot:
+			boot_text = _("at boot")
+		name = service.name
+		if marked:
+			name = "* " + name
+		entry = (name, service.description, self.pixmaps[status_png], self.pixmaps[state_png], self.pixmaps["div"], service, boot_text)
+		self.entries[key] = entry
+		return entry
+
+	def somethingRunning(self):
+		for service in self.serviceList:
+			if service.state or service.state is None:
+				return True
+		return False
+				
+	def updateEntryList(self):
+		self.list = []
+		self.rlist = []
+		for service in self.serviceList:
+			entry = self.buildEntryComponent(service)
+			if service.state or service.state is None:
+				self.rlist.append(entry)
+			self.list.append(entry)
+		if len(self.rlist) == 0:
+			self["key_yellow"].setText("")
+		elif self.running_view:
+			self["key_yellow"].setText("View all")
+			self.list = self.rlist
+		else:
+			self["key_yellow"].setText("View running")
+		self.updateRows(self.list)
+
+	def updateRows(self, entries):						# patch only the rows that changed, keep the cursor on its service
+		rows = self["list"].list
+		if len(rows) == len(entries) and not [index for (index, entry) in enumerate(entries) if rows[index][5] is not entry[5]]:
+			for (index, entry) in enumerate(entries):
+				if rows[index] is not entry:
+					self["list"].modifyEntry(index, entry)
+			self.list = rows
+			return
+		current = self["list"].getCurrent()
+		self["list"].setList(entries)
+		if current is not None:
+			for (index, entry) in enumerate(entries):
+				if entry[5] is current[5]:
+					self["list"].setIndex(index)
+					break
+
+	def switchList(self):
+		if self.running_view:
+			if self.somethingRunning():
+				self.running_view = False
+				self["key_yellow"].setText("View running")
+				self.updateEntryList()
+		else:
+			if not self.somethingRunning():
+				return
+			self.running_view = True
+			self["key_yellow"].setText("View all")
+			self.updateEntryList()
+			self.selectionChanged()
+
+	def checkInstall(self):
+		self.sc.packageindex.update([service.package for service in self.serviceList if not service.status])
+		self.checkServiceListStatus(self.serviceList)
+		installed = [service.name for service in self.installqueue if service.status]
+		failed = [service.name for service in self.installqueue if not service.status]
+		text = ""
+		if installed:
+			text = _("Package %s installed.") % ", ".join(installed)
+		if failed:
+			text += (text and "\n" or "") + _("Could not install %s package...") % ", ".join(failed)
+		self["status"].setText(text)
+		message = self.session.open(MessageBox, text, failed and MessageBox.TYPE_ERROR or MessageBox.TYPE_INFO, timeout=4)
+		message.setTitle(_("Package installer"))
+		if installed:
+			self.getPkgInfo()
+			self.getBootInfo()
+			self.updateServiceListState()
+		self.installqueue = None
+
+	def installProgress(self, line):
+		self["status"].setText(self.installtext + "\n\n" + line)
+
+	def installFinished(self, retval):
+		print ("[ServiceManager] opkg install finished:", retval)
+		self.msg.close()
+
+	def installPackages(self, services):					# one opkg run, one dependency resolution for all
+		self.installqueue = services
+		self.installtext = _("Installling %s...") % ", ".join([service.name for service in services])
+		self["status"].setText(self.installtext)
+		self.msg = self.session.openWithCallback(self.checkInstall, MessageBox, self.installtext, MessageBox.TYPE_INFO, enable_input=False)
+		self.msg.setTitle(_("Package installer"))
+		self.sc.runStreaming("opkg install %s" % " ".join([service.package for service in services]), self.installProgress, self.installFinished)
+
+	def installConfirm(self, confirmed):
+		if confirmed:
+			self.installPackages([self.installpkg])
+		self.installpkg = None
+
+	def selectService(self):
+		current = self["list"].getCurrent()
+		if current is not None:
+			current = current[5]
+			if not current.status:
+				self.installpkg = current
+				self.session.openWithCallback(self.installConfirm, MessageBox, _("Do you want to install %s package?") % current.name, MessageBox.TYPE_YESNO, default = False)
+				return
+			self.curstate = current.state
+			self.curboot = current.boot
+			self.session.openWithCallback(self.stateCallback, ServiceControlPanel, current)
+
+	def keyGreen(self):
+		if self.marked:
+			choices = []
+			if [service for service in self.serviceList if service.name in self.marked and not service.status]:
+				choices.append((_("Install"), "install"))
+			if [service for service in self.serviceList if service.name in self.marked and service.status]:
+				choices += [(_("Start"), "start"), (_("Stop"), "stop"), (_("Restart"), "restart")]
+			self.session.openWithCallback(self.batchActionSelected, ChoiceBox, title=_("Action for %d selected services") % len(self.marked), list=choices)
+		else:
+			self.selectService()
+
+	def markService(self):
+		current = self["list"].getCurrent()
+		if current is None:					# empty list, e.g. running view with nothing running
+			return
+		current = current[5]
+		if current.name in self.marked:
+			self.marked.discard(current.name)
+		else:
+			self.marked.add(current.name)
+		self["key_green"].setText(self.marked and _("Actions") or "OK")
+		self.updateEntryList()
+
+	def batchActionSelected(self, choice):
+		if choice is None:
+			return
+		action = self.batch_action = choice[1]
+		if action == "install":
+			self.installPackages([service for service in self.serviceList if service.name in self.marked and not service.status])
+			self.marked = set()
+			self["key_green"].setText("OK")
+			self.updateEntryList()
+			return
+		services = [service for service in self.serviceList if service.name in self.marked and service.status]
+		if action != "stop":
+			services = requiredClosure(services, self.serviceList)
+		for service in services:
+			userAction(service.name, action)
+		text = _("Action: %s\nServices: %s") % (action, ", ".join([service.name for service in services]))
+		self.msg = self.session.open(MessageBox, text, MessageBox.TYPE_INFO, enable_input=False)
+		self.msg.setTitle(_("Service Control Center"))
+		self.sc.runBatch(services, action, self.batchFinished, config.plugins.servicemanager.batchConcurrency.value)
+
+	def batchFinished(self, results, elapsed):
+		self.msg.close()
+		text = ""
+		failed = False
+		for (service, retval) in results:
+			if retval == 0:
+				text += _("%s: done") % service.name + "\n"
+			elif retval is None:
+				text += _("%s: no action") % service.name + "\n"
+			elif retval == BATCH_SKIPPED:
+				failed = True
+				text += _("%s: skipped, required service failed") % service.name + "\n"
+			else:
+				failed = True
+				text += _("%s: failed (%s)") % (service.name, retval) + "\n"
+		text += "\n" + _("Elapsed: %.1f s") % elapsed
+		self.marked = set()
+		self["key_green"].setText("OK")
+		message = self.session.open(MessageBox, text, failed and MessageBox.TYPE_ERROR or MessageBox.TYPE_INFO, timeout=10)
+		message.setTitle(_("Service Control Center"))
+		self.getBootInfo()
+		self.updateServiceListState()
+		for (service, retval) in results:
+			self.watcher.watch(service, self.batchStateChanged, self.batch_action != "stop")
+
+	def stateCallback(self, state):
+		if self.curstate == state and self.curboot == self["list"].getCurrent()[5].boot:
+			return
+		self["list"].getCurrent()[5].state = state
+		self.updateEntryList()
+
+	def pluginsetup(self):
+		self.session.openWithCallback(self.viewCallback, ServiceCenterSetup)
+
+	def viewCallback(self, switch_now=False):
+		if switch_now and self.running_view is not config.plugins.servicemanager.showOnlyRunning.value:
+			self.switchList()
+
+watchdog = None
+
+def updateWatchdog():
+	global watchdog
+	if watchdog is not None:
+		watchdog.stop()
+		watchdog = None
+	if config.plugins.servicemanager.watchdog.value:
+		watchdog = ServiceWatchdog(ServiceController(), servicecatalog, config.plugins.servicemanager.watchdogInterval.value)
+		watchdog.start()
+
+apiserver = None
+
+def socketNotifier(fd, callback, events=POLLIN):
+	notifier = eSocketNotifier(fd, events)
+	notifier.callback.append(callback)
+	return notifier
+
+def updateAPI():
+	global apiserver
+	if apiserver is not None:
+		apiserver.close()
+		apiserver = None
+	if config.plugins.servicemanager.api.value:
+		try:
+			apiserver = APIServer(ServiceAPI(ServiceController(), servicecatalog, userAction), API_SOCKET, socketNotifier)
+		except (IOError, OSError) as e:
+			print ("[ServiceManager] could not start control socket:", e)
+
+warmer = None
+warmer_timer = None
+
+def installWarmup():
+	if warmer is not None:
+		warmer.install()
+
+def updateWarmup():
+	global warmer, warmer_timer
+	if warmer is not None:
+		warmer.stop()
+		warmer = None
+	if warmer_timer is None:
+		warmer_timer = eTimer()
+		warmer_timer.callback.append(installWarmup)
+	warmer_timer.stop()
+	if config.plugins.servicemanager.warmup.value:
+		loadPixmaps()						# LoadPixmap keeps them, must run on the main thread
+		warmer = CacheWarmer(servicecatalog, ServiceController())
+		warmer.start()
+		warmer_timer.start(WARMUP_INSTALL_POLL)			# results are adopted on the main thread only
@@ -0,0 +1,106 @@
+import os
+import copy
+import threading
+
+try:
+	from queue import Queue, Empty
+except ImportError:
+	from Queue import Queue, Empty
+
+from .catalog import ServiceCatalog, PROBE_PROCESS
+from .pkgindex import PackageIndex
+from .bootlinks import BootLinkIndex
+from .inetdconf import InetdConfig
+from .proctable import ProcTable
+
+WARMUP_INTERVAL = 300		# seconds between refreshes, each one only rereads what changed
+
+# Background thread that prepares the catalog, package index, boot links,
+# inetd.conf and a process snapshot before the Service Center is opened,
+# then keeps them fresh. The thread only works on private readers of the
+# same files; what changed is queued, and install() adopts it into the
+# shared indexes and pins the running services' pids. install() must run on
+# the main thread (servicecenter.py polls it from an eTimer), so the shared
+# state is never touched by two threads. Every refresh is an mtime check
+# unless a file really changed. The thread runs niced; on Linux nice()
+# affects only the calling thread.
+class CacheWarmer(threading.Thread):
+
+	def __init__(self, catalog, controller, interval=WARMUP_INTERVAL):
+		threading.Thread.__init__(self, name="ServiceManagerWarmup")
+		self.daemon = True
+		self.catalog = catalog				# shared, main thread only
+		self.sc = controller				# shared, main thread only
+		self.interval = interval
+		self.stopping = threading.Event()
+		self.results = Queue()
+		# private readers, thread only
+		self.private = ServiceCatalog(catalog.filename, catalog.dropin)
+		self.packages = PackageIndex(controller.packageindex.statusfile, controller.packageindex.infodir)
+		self.links = BootLinkIndex(controller.bootlinks.etc_root)
+		self.inetd = InetdConfig(controller.inetdconf.filename)
+		self.procs = ProcTable(controller.proctable.root)
+
+	def run(self):
+		try:
+			os.nice(19)
+		except (AttributeError, OSError):
+			pass
+		while not self.stopping.is_set():
+			self.refresh()
+			self.stopping.wait(self.interval)
+
+	def fragmentKeys(self, fragments):
+		return dict((filename, entry[0]) for (filename, entry) in fragments.items())
+
+	def refresh(self):						# worker thread
+		try:
+			result = {}
+			keys = self.fragmentKeys(self.private.fragments)
+			self.private.load()
+			if self.fragmentKeys(self.private.fragments) != keys:
+				result["catalog"] = copy.deepcopy(self.private.fragments)	# merge() may edit the private services later
+			if self.packages.refresh():
+				result["packages"] = (self.packages.key, self.packages.packages)
+			if self.links.refresh():
+				result["bootlinks"] = (self.links.key, self.links.scripts)
+			key = self.inetd.key
+			self.inetd.refresh()
+			if self.inetd.key != key:
+				result["inetd"] = (self.inetd.key, self.inetd.lines, self.inetd.services)
+			result["proc"] = self.procs.scan()
+			self.results.put(result)
+		except Exception as e:
+			print ("[CacheWarmer] refresh failed:", e)
+
+	def install(self):						# main thread
+		while True:
+			try:
+				result = self.results.get_nowait()
+			except Empty:
+				return
+			fragments = result.get("catalog")
+			if fragments is not None and self.fragmentKeys(self.catalog.fragments) != self.fragmentKeys(fragments):
+				self.catalog.fragments = fragments
+				self.catalog.services = []			# merged by the next load()
+			indexes = self.sc.packageindex
+			if "packages" in result and indexes.key != result["packages"][0]:
+				(indexes.key, indexes.packages) = result["packages"]
+			if "bootlinks" in result and self.sc.bootlinks.key != result["bootlinks"][0]:
+				(self.sc.bootlinks.key, self.sc.bootlinks.scripts) = result["bootlinks"]
+			if "inetd" in result and self.sc.inetdconf.key != result["inetd"][0]:
+				(self.sc.inetdconf.key, self.sc.inetdconf.lines, self.sc.inetdconf.services) = result["inetd"]
+			self.pin(result["proc"])
+
+	def pin(self, index):
+		proctable = self.sc.proctable
+		for srv in self.catalog.load():
+			if srv.probe != PROBE_PROCESS or not self.sc.packageindex.installed(srv.package):
+				continue
+			if proctable.pinned(srv.name) is None:
+				for pid in index.get(srv.demon, []):
+					if proctable.pin(srv.name, pid):
+						break
+
+	def stop(self):
+		self.stopping.set()
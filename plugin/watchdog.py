@@ -0,0 +1,123 @@
+import os
+import time
+
+from enigma import eTimer
+
+from .fileutil import atomicWrite
+from .pkgindex import packageindex
+
+BACKOFF_START = 10		# seconds before the second restart, doubled for each further one
+BACKOFF_MAX = 600
+CRASH_LIMIT = 5			# restarts within CRASH_WINDOW before giving up
+CRASH_WINDOW = 1800
+LOG_MAX = 65536			# bytes, the older half is dropped beyond
+
+stopped = set()			# services the user stopped on purpose
+
+def userAction(name, action):
+	if action == "stop":
+		stopped.add(name)
+	else:
+		stopped.discard(name)
+
+# one line per event: "<unix time> <event> <service> [detail]"
+class EventLog():
+
+	def __init__(self, filename, maxsize=LOG_MAX):
+		self.filename = filename
+		self.maxsize = maxsize
+
+	def write(self, event, name, detail=""):
+		line = ("%d %s %s %s" % (time.time(), event, name.replace(" ", "_"), detail)).rstrip() + "\n"
+		print ("[ServiceWatchdog]", line.strip())
+		try:
+			with open(self.filename, "a") as f:
+				f.write(line)
+			if os.path.getsize(self.filename) > self.maxsize:
+				with open(self.filename, "r") as f:
+					lines = f.readlines()
+				atomicWrite(self.filename, lines[len(lines) // 2:], backups=0)
+		except (IOError, OSError):
+			pass
+
+# Checks the services marked watch="1" with the controller's probes and
+# restarts the ones that died, with exponential backoff and a crash-loop limit.
+class ServiceWatchdog():
+
+	def __init__(self, controller, catalog, interval=60, logfile="/var/log/servicemanager-watchdog.log"):
+		self.sc = controller
+		self.catalog = catalog
+		self.interval = interval
+		self.log = EventLog(logfile)
+		self.alive = {}			# name -> last seen running
+		self.restarts = {}		# name -> [restart times within CRASH_WINDOW]
+		self.due = {}			# name -> time of the next restart
+		self.givenup = set()
+		self.busy = False
+		self.timer = eTimer()
+		self.timer.callback.append(self.check)
+
+	def start(self):
+		self.log.write("start", "watchdog", "interval=%d" % self.interval)
+		self.check()
+
+	def stop(self):
+		self.timer.stop()
+
+	def backoff(self, name):
+		count = len(self.restarts.get(name, []))
+		if not count:
+			return 0
+		return min(BACKOFF_MAX, BACKOFF_START * 2 ** (count - 1))
+
+	def check(self):
+		self.timer.stop()
+		now = time.time()
+		if not self.busy:
+			try:
+				services = self.catalog.load()
+			except Exception:
+				services = []
+			packageindex.refresh()
+			services = [srv for srv in services if srv.watch == "1" and packageindex.installed(srv.package)]
+			self.sc.probeStates(services)
+			restart = []
+			for srv in services:
+				name = srv.name
+				if srv.state is not False:
+					if name in self.due or name in self.givenup:
+						self.log.write("recovered", name)
+					self.alive[name] = True
+					self.due.pop(name, None)
+					self.givenup.discard(name)
+					stopped.discard(name)
+					continue
+				if name in stopped or name in self.givenup:
+					self.alive[name] = False
+					continue
+				if self.alive.get(name):		# was running at the last check
+					self.alive[name] = False
+					self.log.write("died", name)
+					self.restarts[name] = [t for t in self.restarts.get(name, []) if now - t < CRASH_WINDOW]
+					if len(self.restarts[name]) >= CRASH_LIMIT:
+						self.log.write("crashloop", name, "restarts=%d" % len(self.restarts[name]))
+						self.givenup.add(name)
+						continue
+					self.due[name] = now + self.backoff(name)
+				if name in self.due and self.due[name] <= now:
+					del self.due[name]
+					self.restarts.setdefault(name, []).append(now)
+					restart.append(srv)
+			if restart:
+				self.busy = True
+				self.sc.runBatch(restart, "restart", self.restartFinished)
+		delay = self.interval
+		if self.due:
+			delay = max(1, min(delay, min(self.due.values()) - now))
+		self.timer.start(int(delay * 1000), True)
+
+	def restartFinished(self, results, elapsed):
+		self.busy = False
+		for (srv, retval) in results:
+			self.log.write("restart", srv.name, "retval=%s attempt=%d %.1fs" % (retval, len(self.restarts.get(srv.name, [])), elapsed))
+			self.alive[srv.name] = True		# died again by the next check counts as another crash
@@ -0,0 +1,121 @@
+import os
+import time
+
+from select import POLLIN
+
+from enigma import eTimer, eSocketNotifier
+
+from .inotify import Inotify
+from .catalog import PROBE_PIDFILE, PROBE_INETD
+
+POLL_START = 100		# ms, first poll after an action
+POLL_MAX = 2000			# ms, backoff limit
+
+# Reports service state changes. Pidfile and inetd.conf changes are picked up
+# through inotify; services without a file signal are polled with exponential
+# backoff until they reach the target state or their deadline passes.
+class StateWatcher():
+
+	def __init__(self, controller):
+		self.sc = controller
+		self.watches = []			# [service, callback, target, deadline, state, path, polled]
+		self.delay = POLL_START
+		self.timer = eTimer()
+		self.timer.callback.append(self.poll)
+		self.inotify = None
+		self.notifier = None
+		self.dirs = set()
+		try:
+			self.inotify = Inotify()
+			self.notifier = eSocketNotifier(self.inotify.fileno(), POLLIN)
+			self.notifier.callback.append(self.fileEvent)
+		except OSError as e:
+			print ("[StateWatcher] inotify not available, polling only:", e)
+			self.inotify = None
+
+	def signalPath(self, srv):
+		if srv.probe == PROBE_PIDFILE:
+			return srv.pidfile
+		elif srv.probe == PROBE_INETD:
+			return self.sc.inetdconf.filename
+		return None
+
+	def addWatch(self, path):
+		if self.inotify is None or path is None:
+			return False
+		directory = os.path.dirname(path)
+		if directory not in self.dirs:
+			try:
+				self.inotify.addWatch(directory)
+			except OSError:
+				return False
+			self.dirs.add(directory)
+		return True
+
+	# target: state to reach (True running, False stopped) or None to watch
+	# until the deadline; timeout None watches file events only, forever
+	def watch(self, srv, callback, target=None, timeout=30):
+		path = self.signalPath(srv)
+		signalled = self.addWatch(path)
+		if timeout is None and not signalled:
+			return False
+		self.unwatch(srv, callback)
+		deadline = None
+		if timeout is not None:
+			deadline = time.time() + timeout
+		# inetd reacts on its HUP, not on the inetd.conf change, so only pidfiles are a reliable signal
+		polled = timeout is not None and not (signalled and srv.probe == PROBE_PIDFILE)
+		self.watches.append([srv, callback, target, deadline, srv.state, signalled and path, polled])
+		if timeout is not None:
+			if polled:
+				self.delay = POLL_START
+			self.schedule()
+		return True
+
+	def unwatch(self, srv, callback):
+		self.watches = [watch for watch in self.watches if watch[0] is not srv or watch[1] != callback]
+
+	def probe(self, watches):
+		self.sc.probeStates([watch[0] for watch in watches], 0)
+		now = time.time()
+		for watch in watches:
+			(srv, callback, target, deadline, state, path, polled) = watch
+			reached = target is not None and (srv.state is not False) == target
+			expired = deadline is not None and now >= deadline
+			if reached or expired:
+				self.watches = [other for other in self.watches if other is not watch]
+			if srv.state != state or reached or expired:
+				watch[4] = srv.state
+				callback(srv)
+
+	def fileEvent(self, fd):
+		changed = set(os.path.join(directory, name) for (directory, name, mask) in self.inotify.read())
+		watches = [watch for watch in self.watches if watch[5] in changed]
+		if watches:
+			self.probe(watches)
+
+	def schedule(self):
+		now = time.time()
+		delays = [int((watch[3] - now) * 1000) for watch in self.watches if watch[3] is not None]
+		if [watch for watch in self.watches if watch[6]]:
+			delays.append(self.delay)
+		if delays:
+			self.timer.start(max(10, min(delays)), True)
+		else:
+			self.timer.stop()
+
+	def poll(self):
+		now = time.time()
+		due = [watch for watch in self.watches if watch[6] or watch[3] is not None and now >= watch[3]]
+		if due:
+			self.probe(due)
+		self.delay = min(self.delay * 2, POLL_MAX)
+		self.schedule()
+
+	def stop(self):
+		self.timer.stop()
+		self.watches = []
+		if self.inotify is not None:
+			self.notifier = None
+			self.inotify.close()
+			self.inotify = None
@@ -0,0 +1,64 @@
+# Static check for names used but never defined in the plugin modules: an
+# import dropped while moving code between modules otherwise only shows up
+# as a NameError on the box, when the screen is opened.
+#
+#   python tools/check_names.py [files...]
+#
+# Prints "file:line: undefined name 'x'" for each finding and exits 1 if
+# there is any. enigma2 installs _ (gettext) as a builtin, so it is known.
+
+import os
+import sys
+import ast
+import symtable
+
+try:
+	import builtins
+except ImportError:
+	import __builtin__ as builtins
+
+KNOWN = set(dir(builtins)) | set(["_", "__file__", "__name__", "__doc__", "__package__", "__path__"])
+
+def moduleNames(table):
+	return set(symbol.get_name() for symbol in table.get_symbols() if symbol.is_assigned() or symbol.is_imported())
+
+def globalUses(table, found):				# -> names read as globals in any nested scope
+	for child in table.get_children():
+		for symbol in child.get_symbols():
+			if symbol.is_referenced() and symbol.is_global() and not symbol.is_assigned():
+				found.add(symbol.get_name())
+		globalUses(child, found)
+	return found
+
+def firstLine(tree, name):
+	for node in ast.walk(tree):
+		if isinstance(node, ast.Name) and node.id == name:
+			return node.lineno
+	return 0
+
+def check(filename):
+	with open(filename, "r") as f:
+		source = f.read()
+	table = symtable.symtable(source, filename, "exec")
+	defined = moduleNames(table) | KNOWN
+	used = globalUses(table, set())
+	for symbol in table.get_symbols():
+		if symbol.is_referenced() and not symbol.is_assigned() and not symbol.is_imported():
+			used.add(symbol.get_name())
+	tree = ast.parse(source, filename)
+	return sorted((firstLine(tree, name), name) for name in used - defined)
+
+def main():
+	files = sys.argv[1:]
+	if not files:
+		plugindir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "plugin")
+		files = [os.path.join(plugindir, name) for name in sorted(os.listdir(plugindir)) if name.endswith(".py")]
+	failed = False
+	for filename in files:
+		for (line, name) in check(filename):
+			print ("%s:%d: undefined name '%s'" % (os.path.relpath(filename), line, name))
+			failed = True
+	sys.exit(failed and 1 or 0)
+
+if __name__ == "__main__":
+	main()